@@ -0,0 +1,47 @@
+import argparse
+
+import transcribe
+
+def make_args(output_dir):
+    return argparse.Namespace(
+        output_dir=str(output_dir),
+        model_size="small",
+        compute_type="int8",
+        beam_size=5,
+        batch_size=1,
+        language=None,
+        vad=False,
+        checkpoint_interval=30,
+    )
+
+def write_checkpoint(audio, args, segments):
+    writer = transcribe.CheckpointWriter(str(audio), args)
+    writer.begin(transcribe.CachedInfo("en", 0.9, 60.0, 60.0))
+    for seg in segments:
+        writer.write(seg)
+    # abort() keeps the sidecar, as after a crash
+    writer.abort()
+
+def test_resume_cuts_off_torn_last_line(tmp_path):
+    audio = tmp_path / "call.wav"
+    audio.write_bytes(b"RIFF....")
+    args = make_args(tmp_path)
+    write_checkpoint(audio, args, [
+        transcribe.CachedSegment(0.0, 1.5, " one"),
+        transcribe.CachedSegment(1.5, 3.0, " two"),
+    ])
+    # A crash mid-write leaves part of the next record without its newline
+    with open(transcribe.checkpoint_path(str(audio), args), "a", encoding="utf-8") as f:
+        f.write('{"start": 3.0, "en')
+
+    resume = transcribe.load_checkpoint(str(audio), args)
+    assert [seg.text for seg in resume.segments] == [" one", " two"]
+
+    writer = transcribe.CheckpointWriter(str(audio), args, resume)
+    writer.write(transcribe.CachedSegment(3.0, 4.5, " three"))
+    writer.abort()
+
+    # The second resume must see the segment decoded after the first one
+    resume = transcribe.load_checkpoint(str(audio), args)
+    assert [seg.text for seg in resume.segments] == [" one", " two", " three"]
+    assert resume.end == 4.5
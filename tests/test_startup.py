@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# `import transcribe` must stay cheap: --help, cache hits and worker start-up
+# pay for it before any model work. Generous enough for slow CI machines.
+IMPORT_BUDGET_SECONDS = 1.5
+
+HEAVY_MODULES = ["torch", "faster_whisper", "ctranslate2"]
+
+CHILD_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import transcribe
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+def import_transcribe():
+    """Imports transcribe in a fresh interpreter and returns its import time and the heavy modules it loaded."""
+    result = subprocess.run([sys.executable, "-c", CHILD_SCRIPT], cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_stays_under_budget():
+    report = import_transcribe()
+    assert report["elapsed"] < IMPORT_BUDGET_SECONDS, f"import transcribe took {report['elapsed']:.2f}s"
+
+def test_import_does_not_load_heavy_modules():
+    assert import_transcribe()["loaded"] == []
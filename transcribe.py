@@ -1,10 +1,27 @@
 
 import argparse
+import dataclasses
+import glob
+import hashlib
 import os
+import sys
 import json
-import torch
-from faster_whisper import WhisperModel
+import textwrap
+import wave
+import multiprocessing
+import queue
+import random
+import socketserver
+import threading
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import timedelta
+from functools import lru_cache
+from bisect import bisect_left
+from itertools import chain, islice
+from stat import S_ISFIFO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from colorama import Fore, Style, init
 import time
 from tqdm import tqdm
@@ -13,6 +30,9 @@ from tqdm import tqdm
 # Initialize colorama
 init(autoreset=True)
 
+# Extensions picked up by --input_dir
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".aac", ".wma", ".mp4", ".mkv", ".webm", ".mov")
+
 def format_srt_timestamp(seconds):
     """Formats seconds into HH:MM:SS,ms for SRT files."""
     td = timedelta(seconds=seconds)
@@ -22,28 +42,168 @@ def format_srt_timestamp(seconds):
     milliseconds = td.microseconds // 1000
     return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
 
-def write_srt(segments, out_path):
-    with open(out_path, "w", encoding="utf-8") as f:
-        for i, seg in enumerate(segments, 1):
-            f.write(f"{i}\n")
-            f.write(f"{format_srt_timestamp(seg.start)} --> {format_srt_timestamp(seg.end)}\n")
-            f.write(f"{seg.text.strip()}\n\n")
+class SegmentWriter:
+    """Appends each segment to an output file as soon as it is decoded.
 
-def write_txt(segments, out_path):
-    with open(out_path, "w", encoding="utf-8") as f:
-        for seg in segments:
-            f.write(f"{seg.text.strip()}\n")
+    Segments go to "<out_path>.part", flushed after every segment so it can be
+    tailed while the job runs, and nothing is buffered beyond the current
+    segment. close() renames the file into place, so a file under its final
+    name is always complete.
+    """
+    label = None
 
-def write_json(segments, out_path):
-    output = []
-    for seg in segments:
-        output.append({
+    def __init__(self, out_path, tmp_path=None):
+        self.path = out_path
+        self.tmp_path = tmp_path or out_path + ".part"
+        self.f = open(self.tmp_path, "w", encoding="utf-8")
+
+    def begin(self, info):
+        """Called once faster-whisper has returned the transcription info, before the first segment."""
+
+    def write(self, seg):
+        self.write_segment(seg)
+        self.f.flush()
+
+    def write_segment(self, seg):
+        raise NotImplementedError
+
+    def close(self, info=None):
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Called instead of close() when transcription fails part-way; the .part file is left as is."""
+        self.f.close()
+
+class SrtWriter(SegmentWriter):
+    label = "SRT"
+
+    def __init__(self, out_path):
+        super().__init__(out_path)
+        self.index = 0
+
+    def write_segment(self, seg):
+        self.index += 1
+        self.f.write(f"{self.index}\n")
+        self.f.write(f"{format_srt_timestamp(seg.start)} --> {format_srt_timestamp(seg.end)}\n")
+        self.f.write(f"{seg.text.strip()}\n\n")
+
+class TxtWriter(SegmentWriter):
+    label = "TXT"
+
+    def write_segment(self, seg):
+        self.f.write(f"{seg.text.strip()}\n")
+
+class JsonWriter(SegmentWriter):
+    """Writes the same indented JSON array as json.dump(..., indent=2), one element at a time.
+
+    The closing bracket is only written by close(), so the file is valid JSON
+    once the transcription has finished.
+    """
+    label = "JSON"
+
+    def __init__(self, out_path):
+        super().__init__(out_path)
+        self.count = 0
+
+    def write_segment(self, seg):
+        entry = json.dumps({
             "start": seg.start,
             "end": seg.end,
             "text": seg.text.strip()
-        })
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2)
+        }, indent=2)
+        self.f.write("[\n" if self.count == 0 else ",\n")
+        self.f.write(textwrap.indent(entry, "  "))
+        self.count += 1
+
+    def close(self, info=None):
+        self.f.write("\n]" if self.count else "[]")
+        super().close(info)
+
+# Writer class for each value accepted by --formats
+OUTPUT_WRITERS = {
+    "srt": SrtWriter,
+    "json": JsonWriter,
+    "txt": TxtWriter,
+}
+
+class SegmentCollector:
+    """In-memory writer that keeps segments as dicts, e.g. to return them from the server."""
+    label = None
+
+    def __init__(self):
+        self.segments = []
+
+    def begin(self, info):
+        pass
+
+    def write(self, seg):
+        self.segments.append({"start": seg.start, "end": seg.end, "text": seg.text.strip()})
+
+    def close(self, info=None):
+        pass
+
+    def abort(self):
+        pass
+
+class NdjsonWriter:
+    """Streams one JSON record per segment to stdout for --stdout ndjson, then a summary record per file.
+
+    Every record is flushed on its own line as soon as it is written, so a
+    downstream consumer sees each segment with first-segment latency. RTF is
+    measured from when the writer was opened (i.e. including decoding the
+    audio) to close().
+    """
+    label = None
+
+    def __init__(self, file_path, stream=None):
+        self.file_path = file_path
+        # The original stdout: in ndjson mode sys.stdout is pointed at stderr for the human-readable output
+        self.stream = stream or sys.__stdout__
+        self.start_time = time.time()
+        self.index = 0
+
+    def emit(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def begin(self, info):
+        pass
+
+    def write(self, seg):
+        self.emit({"type": "segment", "file": self.file_path, "id": self.index, "start": seg.start, "end": seg.end, "text": seg.text.strip()})
+        self.index += 1
+
+    def close(self, info=None):
+        elapsed = time.time() - self.start_time
+        record = {"type": "summary", "file": self.file_path, "segments": self.index, "elapsed": round(elapsed, 3)}
+        if info is not None:
+            record.update({
+                "language": info.language,
+                "language_probability": info.language_probability,
+                "duration": info.duration,
+                "rtf": round(elapsed / info.duration, 4) if info.duration > 0 else None,
+            })
+        self.emit(record)
+
+    def abort(self):
+        # Tells consumers to drop the segments already streamed for this file
+        self.emit({"type": "error", "file": self.file_path, "segments": self.index})
+
+def write_segments(writer, segments):
+    """Runs a finished segment list through a streaming writer."""
+    for seg in segments:
+        writer.write(seg)
+    writer.close()
+
+def write_srt(segments, out_path):
+    write_segments(SrtWriter(out_path), segments)
+
+def write_txt(segments, out_path):
+    write_segments(TxtWriter(out_path), segments)
+
+def write_json(segments, out_path):
+    write_segments(JsonWriter(out_path), segments)
 
 def get_user_choice(prompt_text, options, default=None):
     """Prompts user to select from a list of options."""
@@ -84,7 +244,7 @@ def interactive_setup(args):
             print(f"{Fore.RED}Error: File not found or is not a valid file. Please try again.{Style.RESET_ALL}")
 
     # Device
-    has_gpu = torch.cuda.is_available()
+    has_gpu = cuda_available()
     available_devices = ["cuda", "cpu"] if has_gpu else ["cpu"]
     default_device = "cuda" if has_gpu else "cpu"
     if len(available_devices) > 1:
@@ -113,7 +273,7 @@ def interactive_setup(args):
     if args.device == "cpu":
         while True:
             try:
-                cpu_threads_str = input(f"\n{Fore.YELLOW}🧵 Enter number of CPU threads (0 for auto) [default: 0]: {Style.RESET_ALL}").strip()
+                cpu_threads_str = input(f"\n{Fore.YELLOW}🧵 Enter number of CPU threads (0 for auto, or this host's --autotune result) [default: 0]: {Style.RESET_ALL}").strip()
                 if not cpu_threads_str:
                     args.cpu_threads = 0
                     break
@@ -157,78 +317,1144 @@ def interactive_setup(args):
     print(f"\n{Fore.CYAN}--- Setup Complete. Starting transcription... ---\n{Style.RESET_ALL}")
     return args
 
-def main():
-    main_start_time = time.time()
+# Lightweight stand-ins for faster-whisper's Segment/TranscriptionInfo when serving from the cache
+CachedSegment = namedtuple("CachedSegment", ["start", "end", "text"])
+CachedInfo = namedtuple("CachedInfo", ["language", "language_probability", "duration", "duration_after_vad"])
 
-    parser = argparse.ArgumentParser(description="🎧 Transcribe audio using faster-whisper")
-    parser.add_argument("--file", help="📂 Path to audio file. If not provided, will enter interactive mode.")
-    parser.add_argument("--language", help="🌐 Language code (e.g., ms, en). Leave empty to auto-detect")
-    parser.add_argument("--output_dir", default=".", help="📁 Directory to save output files")
-    parser.add_argument("--formats", default="srt,json", help="💾 Output formats: srt,json,txt (comma-separated)")
-    parser.add_argument("--model_size", default="medium", help="Size of the Whisper model (e.g., tiny, base, small, medium, large-v2, large-v3)")
-    parser.add_argument("--device", default="auto", choices=["auto", "cuda", "cpu"], help="Device to use for computation (auto, cuda, cpu)")
-    parser.add_argument("--compute_type", default="auto", help="Compute type for the model (e.g., float16, int8_float16, int8, float32). 'auto' selects float16 for GPU and int8 for CPU.")
-    parser.add_argument("--cpu_threads", type=int, default=0, help="Number of CPU threads to use (0 for auto-detection)")
-    parser.add_argument("--beam_size", type=int, default=5, help="Beam size for decoding (e.g., 1 for greedy, 5 for more accuracy)")
+def default_cache_dir():
+    """Per-user cache directory (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "faster-whisper-transcriber")
 
-    args = parser.parse_args()
+def hash_file(file_path):
+    """SHA-256 of the file contents, read in 1 MiB blocks.
 
-    # If no file is provided, enter interactive mode
-    if not args.file:
-        args = interactive_setup(args)
+    Results are memoized per (path, mtime, size), so the transcript and audio
+    caches can both key on the hash without reading the file twice.
+    """
+    stat = os.stat(file_path)
+    return _hash_file(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
 
-    # Resolve device and compute type from 'auto'
-    device = args.device
+@lru_cache(maxsize=4096)
+def _hash_file(file_path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def transcript_cache_key(file_path, args, compute_type):
+    """Cache key: hash of the audio bytes plus every parameter that changes the transcript."""
+    key_data = {
+        "audio": hash_file(file_path),
+        "model_size": args.model_size,
+        "compute_type": compute_type,
+        "beam_size": args.beam_size,
+        "language": args.language,
+    }
+    # Only part of the key when set, so sequential entries keep their old keys
+    if args.batch_size > 1:
+        key_data["batch_size"] = args.batch_size
+    if args.vad:
+        key_data["vad"] = vad_parameters(args)
+    # A pinned or differently sampled language may differ from plain detection
+    if args.language is None and args.language_pin:
+        key_data["language_pin"] = args.language_pin
+    if args.language is None and args.language_windows > 0:
+        key_data["language_windows"] = args.language_windows
+    # Server jobs have no --cascade option
+    if getattr(args, "cascade", None):
+        key_data["cascade"] = [args.cascade, args.cascade_logprob, args.cascade_no_speech, args.cascade_compression]
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+def cache_load(cache_dir, key):
+    """Returns (segment_list, info) for a cached transcript, or None on a miss."""
+    path = os.path.join(cache_dir, "transcripts", key + ".json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Bump the modification time so eviction treats this entry as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    segment_list = [CachedSegment(seg["start"], seg["end"], seg["text"]) for seg in entry["segments"]]
+    return segment_list, CachedInfo(**entry["info"])
+
+class CacheWriter(SegmentWriter):
+    """Streams a transcript into the cache as it is decoded.
+
+    Like the output writers, the entry only appears under its final name once
+    it is complete. The temp file is per-process because several workers may
+    produce the same entry, and it is deleted if transcription fails.
+    """
+
+    def __init__(self, cache_dir, key, max_bytes):
+        self.transcripts_dir = os.path.join(cache_dir, "transcripts")
+        os.makedirs(self.transcripts_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        path = os.path.join(self.transcripts_dir, key + ".json")
+        super().__init__(path, f"{path}.{os.getpid()}.tmp")
+        self.f.write('{"segments": [')
+        self.count = 0
+
+    def write(self, seg):
+        # No per-segment flush: nothing reads a cache entry before it is complete
+        self.write_segment(seg)
+
+    def write_segment(self, seg):
+        if self.count:
+            self.f.write(", ")
+        self.f.write(json.dumps({"start": seg.start, "end": seg.end, "text": seg.text}))
+        self.count += 1
+
+    def close(self, info=None):
+        self.f.write('], "info": ' + json.dumps({
+            "language": info.language,
+            "language_probability": info.language_probability,
+            "duration": info.duration,
+            "duration_after_vad": info.duration_after_vad,
+        }) + "}")
+        super().close(info)
+        cache_evict(self.transcripts_dir, self.max_bytes, keep=os.path.basename(self.path))
+
+    def abort(self):
+        self.f.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+def cache_evict(cache_subdir, max_bytes, suffix=".json", keep=None):
+    """Deletes the least-recently-used cache entries until the directory fits in max_bytes.
+
+    The entry named keep (the one just inserted) is never deleted, even if it
+    alone is over the budget.
+    """
+    entries = []
+    for name in os.listdir(cache_subdir):
+        if not name.endswith(suffix) or name == keep:
+            continue
+        try:
+            stat = os.stat(os.path.join(cache_subdir, name))
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_subdir, name))
+        except FileNotFoundError:
+            pass  # Another worker evicted it first
+        total -= size
+
+def load_audio(file_path, args):
+    """Decodes file_path to 16 kHz mono float32 samples, as faster-whisper does internally.
+
+    With --audio_cache the samples are saved once as <cache_dir>/audio/<hash>.npy
+    and returned as a read-only memory map, so re-runs skip the ffmpeg decode
+    and processes reading the same file share its pages.
+    """
+    import_faster_whisper()
+    from faster_whisper import decode_audio
+
+    with METRICS.phase("audio_decode"):
+        if file_path == "-":
+            # PyAV reads the stream as it decodes, so the encoded bytes are never held in full
+            return decode_audio(sys.stdin.buffer)
+        if not args.audio_cache or is_stream_input(file_path):
+            return decode_audio(file_path)
+
+        import numpy as np
+
+        audio_dir = os.path.join(args.cache_dir, "audio")
+        name = hash_file(file_path) + ".npy"
+        path = os.path.join(audio_dir, name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        try:
+            return np.load(path, mmap_mode="r")
+        except FileNotFoundError:
+            pass  # Not cached, or evicted by another process just now
+
+        audio = decode_audio(file_path)
+        os.makedirs(audio_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, audio)
+        os.replace(tmp_path, path)
+        cache_evict(audio_dir, args.audio_cache_max_mb * 1024 * 1024, suffix=".npy", keep=name)
+        try:
+            return np.load(path, mmap_mode="r")
+        except FileNotFoundError:
+            # Evicted by another worker's insert in the meantime
+            return audio
+
+def serve_from_cache(files, args, compute_type):
+    """Writes outputs for every file already in the cache.
+
+    Returns (misses, cache_keys): the files that still need transcribing and
+    the cache key computed for each input.
+    """
+    misses = []
+    cache_keys = {}
+    for file_path in files:
+        if is_stream_input(file_path):
+            # Hashing would consume the stream
+            misses.append(file_path)
+            continue
+        try:
+            key = transcript_cache_key(file_path, args, compute_type)
+        except OSError as e:
+            print(f"{Fore.RED}Could not hash {file_path} for the cache: {e}{Style.RESET_ALL}")
+            misses.append(file_path)
+            continue
+        cache_keys[file_path] = key
+        cached = cache_load(args.cache_dir, key)
+        if cached is None:
+            misses.append(file_path)
+            continue
+        segment_list, info = cached
+        print(f"{Fore.GREEN}♻️  Cached: {file_path} ({info.language}, {timedelta(seconds=round(info.duration))}){Style.RESET_ALL}")
+        write_outputs(segment_list, file_path, args, quiet=len(files) > 1, info=info)
+    return misses, cache_keys
+
+def is_stream_input(file_path):
+    """True for "-" (stdin) and named pipes, which can only be read once and have no size, mtime or hash."""
+    if file_path == "-":
+        return True
+    try:
+        return S_ISFIFO(os.stat(file_path).st_mode)
+    except OSError:
+        return False
+
+def resolve_inputs(args):
+    """Expands --file, --input_dir, --glob and --file_list into a list of audio files."""
+    files = []
+    if args.file:
+        files.append(args.file)
+    if args.input_dir:
+        for name in sorted(os.listdir(args.input_dir)):
+            path = os.path.join(args.input_dir, name)
+            if os.path.isfile(path) and name.lower().endswith(AUDIO_EXTENSIONS):
+                files.append(path)
+    if args.glob:
+        files.extend(path for path in sorted(glob.glob(args.glob, recursive=True)) if os.path.isfile(path))
+    if args.file_list:
+        with open(args.file_list, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip().strip('"').strip("'")
+                if line and not line.startswith("#"):
+                    files.append(line)
+
+    # Drop duplicates (e.g. a file matched by both --input_dir and --glob) and missing paths
+    resolved = []
+    seen = set()
+    for path in files:
+        key = os.path.abspath(path)
+        if key in seen:
+            continue
+        seen.add(key)
+        if not (os.path.isfile(path) or is_stream_input(path)):
+            print(f"{Fore.RED}Skipping missing file: {path}{Style.RESET_ALL}")
+            continue
+        resolved.append(path)
+
+    # Outputs are named after the input's base name, so e.g. a/call.wav and
+    # b/call.wav would overwrite each other's outputs and completion marker
+    by_name = {}
+    for path in resolved:
+        by_name.setdefault(output_basename(path), []).append(path)
+    collisions = {name: paths for name, paths in by_name.items() if len(paths) > 1}
+    if collisions:
+        for name, paths in collisions.items():
+            print(f"{Fore.RED}✘ These inputs would all be written to '{name}.*' in {args.output_dir}: {', '.join(paths)}{Style.RESET_ALL}")
+        print(f"{Fore.RED}Rename them or transcribe them in separate runs with different --output_dir values.{Style.RESET_ALL}")
+        sys.exit(1)
+    return resolved
+
+def cuda_available():
+    """True when CTranslate2 (the runtime faster-whisper uses) can see a CUDA device."""
+    # Imported lazily: ctranslate2 and faster_whisper are slow to import, and
+    # cache hits or --help never need them
+    import ctranslate2
+
+    try:
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+def resolve_device(device):
+    """Resolves 'auto' to 'cuda' when a GPU is available, otherwise 'cpu'."""
     if device == "auto":
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+        return "cuda" if cuda_available() else "cpu"
+    return device
 
-    compute_type = args.compute_type
+def resolve_compute_type(compute_type, device):
+    """Resolves 'auto' to float16 for GPU and int8 for CPU."""
     if compute_type == "auto":
-        compute_type = "float16" if device == "cuda" else "int8"
+        return "float16" if device == "cuda" else "int8"
+    return compute_type
+
+# Upper bounds of the Prometheus histogram buckets
+HISTOGRAM_BUCKETS = {
+    "rtf": (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0),
+    "model_load_seconds": (0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+}
+
+class RunMetrics:
+    """Wall time spent in each phase of a run (model load, audio decode, ...), plus counters and histograms.
+
+    Phases are summed over files and may overlap (e.g. prefetch decodes the
+    next file while the current one is transcribed), so their total can
+    exceed the wall time of the run. Counters (audio seconds, files,
+    segments, errors) and histograms (RTF per file, model load time) feed
+    the Prometheus exposition.
+    """
+
+    def __init__(self):
+        self.phases = {}  # name -> [seconds, count]
+        self.counters = {}  # (name, ((label, value), ...)) -> value
+        self.histograms = {}  # name -> [bucket counts, sum, count]
+        self.lock = threading.Lock()
+
+    def add(self, name, seconds, count=1):
+        with self.lock:
+            total = self.phases.setdefault(name, [0.0, 0])
+            total[0] += seconds
+            total[1] += count
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value):
+        buckets = HISTOGRAM_BUCKETS[name]
+        with self.lock:
+            histogram = self.histograms.setdefault(name, [[0] * len(buckets), 0.0, 0])
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def take(self):
+        """Returns everything recorded so far and starts over, e.g. to send a worker's metrics to the parent."""
+        with self.lock:
+            taken = {"phases": self.phases, "counters": self.counters, "histograms": self.histograms}
+            self.phases, self.counters, self.histograms = {}, {}, {}
+        return taken
 
-    print(f"{Fore.CYAN}🔊 Loading model '{args.model_size}' on device '{device}' with compute type '{compute_type}'...{Style.RESET_ALL}")
+    def merge(self, taken):
+        for name, (seconds, count) in taken["phases"].items():
+            self.add(name, seconds, count)
+        with self.lock:
+            for key, value in taken["counters"].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, (bucket_counts, total, count) in taken["histograms"].items():
+                histogram = self.histograms.setdefault(name, [[0] * len(bucket_counts), 0.0, 0])
+                histogram[0] = [a + b for a, b in zip(histogram[0], bucket_counts)]
+                histogram[1] += total
+                histogram[2] += count
+
+    def summary(self):
+        with self.lock:
+            return {name: {"seconds": round(seconds, 3), "count": count} for name, (seconds, count) in sorted(self.phases.items())}
+
+    def prometheus(self, gauges=None):
+        """Renders everything in the Prometheus text exposition format, with optional extra {name: value} gauges."""
+        def labels(pairs):
+            return "{" + ",".join(f'{label}="{value}"' for label, value in pairs) + "}" if pairs else ""
+
+        lines = []
+        with self.lock:
+            lines += [
+                "# HELP transcriber_phase_seconds_total Wall time spent in each phase.",
+                "# TYPE transcriber_phase_seconds_total counter",
+            ]
+            lines += [f'transcriber_phase_seconds_total{{phase="{name}"}} {seconds:.6f}' for name, (seconds, _) in sorted(self.phases.items())]
+
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE transcriber_{name}_total counter")
+                lines += [f"transcriber_{name}_total{labels(pairs)} {value}" for (counter, pairs), value in sorted(self.counters.items()) if counter == name]
+
+            for name, (bucket_counts, total, count) in sorted(self.histograms.items()):
+                lines.append(f"# TYPE transcriber_{name} histogram")
+                lines += [f'transcriber_{name}_bucket{{le="{bound:g}"}} {bucket_count}' for bound, bucket_count in zip(HISTOGRAM_BUCKETS[name], bucket_counts)]
+                lines += [f'transcriber_{name}_bucket{{le="+Inf"}} {count}', f"transcriber_{name}_sum {total:.6f}", f"transcriber_{name}_count {count}"]
+
+        for name, value in (gauges or {}).items():
+            lines += [f"# TYPE transcriber_{name} gauge", f"transcriber_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+# Metrics of this process; worker processes send theirs back with each result
+METRICS = RunMetrics()
+
+class SectionProfiler:
+    """cProfile that only records inside profiled() blocks, for --profile.
+
+    Only transcription (language detection, encoding, beam search and the
+    segment loop) and the writers are wrapped, so model loading and audio
+    decoding don't drown out the hot path.
+    """
+
+    def __init__(self):
+        import cProfile
+
+        self.profile = cProfile.Profile()
+
+    def save(self, path, top):
+        """Writes the pstats file and prints the top functions by their own time, merged with the worker processes' files.
+
+        With --workers or --chunk_minutes the parent may have profiled nothing
+        itself; only the non-empty profiles are merged.
+        """
+        import pstats
+
+        self.profile.dump_stats(path)
+        merged, sources = None, []
+        for source in [path] + sorted(glob.glob(glob.escape(path) + ".worker*")):
+            try:
+                stats = pstats.Stats(source, stream=sys.stdout)
+            except (OSError, ValueError, EOFError, TypeError):
+                continue  # TypeError: nothing was recorded in that process
+            sources.append(source)
+            if merged is None:
+                merged = stats
+            else:
+                merged.add(stats)
+        if merged is None:
+            print(f"\n{Fore.YELLOW}🔬 Nothing was profiled, so there is no summary (e.g. every file was served from the cache).{Style.RESET_ALL}")
+            return
+        print(f"\n{Fore.CYAN}🔬 Top {top} functions by own time over {len(sources)} process(es) (full profiles: python -m pstats {' '.join(sources)}){Style.RESET_ALL}")
+        merged.strip_dirs().sort_stats("tottime").print_stats(top)
+
+# Set by --profile
+PROFILER = None
+
+@contextmanager
+def profiled():
+    """Records the enclosed block with PROFILER when --profile is active."""
+    if PROFILER is None:
+        yield
+        return
+    PROFILER.profile.enable()
+    try:
+        yield
+    finally:
+        PROFILER.profile.disable()
+
+def import_faster_whisper():
+    """Imports faster-whisper (and with it CTranslate2), timing the first import as the "import" phase."""
+    if "faster_whisper" not in sys.modules:
+        with METRICS.phase("import"):
+            import faster_whisper  # noqa: F401
+
+def record_file(info, transcribe_time, status="transcribed"):
+    """Counts a finished file: its audio seconds and, when it was transcribed, its RTF."""
+    METRICS.count("files", status=status)
+    METRICS.count("audio_seconds", info.duration)
+    if status == "transcribed" and info.duration > 0:
+        METRICS.observe("rtf", transcribe_time / info.duration)
+
+def record_error(error):
+    METRICS.count("files", status="failed")
+    METRICS.count("errors", type=type(error).__name__)
+
+def writer_phase(writer):
+    """Phase name for a writer's time: write_srt, write_json, write_cache, ..."""
+    name = writer.label or type(writer).__name__.replace("Writer", "")
+    return "write_" + name.lower()
+
+def timed_segments(segments):
+    """Yields from faster-whisper's lazy segment generator, timing it as the "first_segment" and "decode" phases.
+
+    Only the time spent inside the generator counts; time spent by the
+    writers between segments is left out. The segments are counted too.
+    """
+    iterator = iter(segments)
+    decode_time = 0.0
+    emitted = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            segment = next(iterator, None)
+            elapsed = time.perf_counter() - start
+            decode_time += elapsed
+            if segment is None:
+                return
+            if emitted == 0:
+                METRICS.add("first_segment", elapsed)
+            emitted += 1
+            yield segment
+    finally:
+        METRICS.add("decode", decode_time)
+        METRICS.count("segments", emitted)
+
+def load_model(model_size, device, compute_type, cpu_threads, num_workers=1):
+    """Builds a WhisperModel; cpu_threads is only passed through on CPU.
+
+    num_workers > 1 lets that many threads run transcribe() on the model in parallel.
+    """
+    import_faster_whisper()
+    from faster_whisper import WhisperModel
 
     model_kwargs = {
         "device": device,
         "compute_type": compute_type,
+        "num_workers": num_workers,
     }
     if device == "cpu":
-        model_kwargs["cpu_threads"] = args.cpu_threads
+        model_kwargs["cpu_threads"] = cpu_threads
+    return WhisperModel(model_size, **model_kwargs)
 
-    model = WhisperModel(args.model_size, **model_kwargs)
+# Approximate parameter counts, used to estimate how much memory a loaded model takes
+MODEL_PARAMETERS = {
+    "tiny": 39e6,
+    "base": 74e6,
+    "small": 244e6,
+    "medium": 769e6,
+    "large": 1550e6,
+    "turbo": 809e6,
+    "distil-small": 166e6,
+    "distil-medium": 394e6,
+    "distil-large": 756e6,
+}
 
-    language_str = args.language if args.language else "Auto-detect"
-    print(f"{Fore.YELLOW}🌍 Language: {language_str}")
-    print(f"{Fore.GREEN}📥 File: {args.file}")
-    print(f"{Fore.BLUE}📤 Output Dir: {args.output_dir}")
-    print(f"{Fore.MAGENTA}💾 Formats: {args.formats.upper()}")
-    print(f"{Fore.YELLOW}⚙️  Settings: Device={device}, Compute={compute_type}, Beam Size={args.beam_size}{Style.RESET_ALL}")
-    if device == "cpu":
-        cpu_threads_str = str(args.cpu_threads) if args.cpu_threads > 0 else "Auto"
-        print(f"{Fore.YELLOW}           CPU Threads={cpu_threads_str}{Style.RESET_ALL}\n")
-    else:
-        print("")
+# Bytes per weight for each CTranslate2 compute type
+COMPUTE_TYPE_BYTES = {
+    "float32": 4,
+    "float16": 2,
+    "bfloat16": 2,
+    "int16": 2,
+    "int8_float32": 1,
+    "int8_float16": 1,
+    "int8_bfloat16": 1,
+    "int8": 1,
+}
+
+def estimate_model_bytes(model_size, compute_type):
+    """Rough memory footprint of a loaded model, from its parameter count and compute type.
+
+    For a local model directory the size of model.bin is used instead.
+    """
+    model_bin = os.path.join(model_size, "model.bin")
+    if os.path.isfile(model_bin):
+        return os.path.getsize(model_bin)
+    name = model_size.replace(".en", "")
+    if name.endswith("-turbo"):
+        name = "turbo"
+    for prefix in sorted(MODEL_PARAMETERS, key=len, reverse=True):
+        if name.startswith(prefix):
+            return int(MODEL_PARAMETERS[prefix] * COMPUTE_TYPE_BYTES.get(compute_type, 2))
+    return int(MODEL_PARAMETERS["medium"] * COMPUTE_TYPE_BYTES.get(compute_type, 2))
+
+class ModelPool:
+    """Process-wide registry of loaded models keyed by (model_size, device, compute_type, cpu_threads).
+
+    Models stay loaded until their estimated memory pushes the pool over
+    budget_bytes, at which point the least recently used ones are dropped.
+    The most recently requested model is never evicted, and budget_bytes=0
+    means no limit. Each model is loaded at most once even when several
+    threads ask for it at the same time.
+    """
+
+    def __init__(self, budget_bytes=0, num_workers=1):
+        self.budget_bytes = budget_bytes
+        self.num_workers = num_workers
+        self.models = OrderedDict()  # key -> (model, estimated bytes)
+        self.loading = set()
+        self.condition = threading.Condition()
+
+    def get(self, model_size, device, compute_type, cpu_threads, quiet=False):
+        key = (model_size, device, compute_type, cpu_threads)
+        with self.condition:
+            while key in self.loading:
+                self.condition.wait()
+            if key in self.models:
+                self.models.move_to_end(key)
+                return self.models[key][0]
+            self.loading.add(key)
+
+        try:
+            if not quiet:
+                print(f"{Fore.CYAN}🔊 Loading model '{model_size}' on device '{device}' with compute type '{compute_type}'...{Style.RESET_ALL}")
+            start = time.perf_counter()
+            model = load_model(model_size, device, compute_type, cpu_threads, self.num_workers)
+            load_seconds = time.perf_counter() - start
+            METRICS.add("model_load", load_seconds)
+            METRICS.observe("model_load_seconds", load_seconds)
+        finally:
+            with self.condition:
+                self.loading.discard(key)
+                self.condition.notify_all()
+
+        with self.condition:
+            self.models[key] = (model, estimate_model_bytes(model_size, compute_type))
+            self.evict(quiet)
+        return model
+
+    def evict(self, quiet=False):
+        """Drops least recently used models until the pool fits in the budget (caller holds the lock)."""
+        if not self.budget_bytes:
+            return
+        while len(self.models) > 1 and sum(size for _, size in self.models.values()) > self.budget_bytes:
+            (model_size, device, compute_type, _), _ = self.models.popitem(last=False)
+            if not quiet:
+                print(f"{Fore.YELLOW}♻️  Unloaded model '{model_size}' ({device}, {compute_type}) to stay within the model memory budget{Style.RESET_ALL}")
+
+    def loaded(self):
+        with self.condition:
+            return [{"model_size": key[0], "device": key[1], "compute_type": key[2], "cpu_threads": key[3]} for key in self.models]
+
+# Shared by batch mode, worker processes and the server
+MODEL_POOL = ModelPool()
+
+def get_model(model_size, device, compute_type, cpu_threads, quiet=False):
+    """Returns a loaded model from the process-wide pool, loading it on first use."""
+    return MODEL_POOL.get(model_size, device, compute_type, cpu_threads, quiet)
+
+def output_basename(file_path):
+    """Name the outputs of file_path are based on: its file name without extension, or "stdin" for "-"."""
+    if file_path == "-":
+        return "stdin"
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def output_paths(file_path, args):
+    """Maps each requested format to its output path in args.output_dir."""
+    base_filename = output_basename(file_path)
+    formats = [fmt.strip().lower() for fmt in args.formats.split(",")]
+    return {fmt: os.path.join(args.output_dir, base_filename + "." + fmt) for fmt in OUTPUT_WRITERS if fmt in formats}
+
+def completion_marker_path(file_path, args):
+    """Hidden marker next to the outputs that records which formats finished for this input."""
+    return os.path.join(args.output_dir, f".{output_basename(file_path)}.done")
+
+def mark_complete(file_path, args):
+    """Atomically records that every requested output of file_path has been written.
+
+    Formats finished by an earlier run for the same, unchanged source are kept
+    in the marker.
+    """
+    paths = output_paths(file_path, args)
+    # A stream can't be checked for changes, so it is never considered complete
+    if not paths or is_stream_input(file_path):
+        return
+    stat = os.stat(file_path)
+    marker = {
+        "source": os.path.abspath(file_path),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "formats": sorted(paths),
+    }
+    previous = read_completion_marker(file_path, args)
+    if previous and previous.get("source_size") == stat.st_size and previous.get("source_mtime_ns") == stat.st_mtime_ns:
+        marker["formats"] = sorted(set(marker["formats"]) | set(previous.get("formats", [])))
+
+    marker_path = completion_marker_path(file_path, args)
+    tmp_path = f"{marker_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(marker, f)
+    os.replace(tmp_path, marker_path)
+
+def read_completion_marker(file_path, args):
+    try:
+        with open(completion_marker_path(file_path, args), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_complete(file_path, args):
+    """True when a previous run finished every requested format for this exact source file.
+
+    Requires the completion marker, not just the output files, since a file
+    can exist without being complete (e.g. from an older version or a crash).
+    """
+    if is_stream_input(file_path):
+        return False
+    marker = read_completion_marker(file_path, args)
+    if not marker:
+        return False
+    stat = os.stat(file_path)
+    if marker.get("source_size") != stat.st_size or marker.get("source_mtime_ns") != stat.st_mtime_ns:
+        return False
+    paths = output_paths(file_path, args)
+    return bool(paths) and all(fmt in marker.get("formats", []) and os.path.isfile(path) for fmt, path in paths.items())
+
+def checkpoint_path(file_path, args):
+    """Hidden sidecar next to the outputs that holds the segments decoded so far."""
+    return os.path.join(args.output_dir, f".{output_basename(file_path)}.ckpt")
+
+def checkpoint_settings(file_path, args):
+    """Everything that must match for a checkpoint to be resumed."""
+    stat = os.stat(file_path)
+    return {
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "model_size": args.model_size,
+        "compute_type": args.compute_type,
+        "beam_size": args.beam_size,
+        "batch_size": args.batch_size,
+        "language": args.language,
+        "vad": vad_parameters(args) if args.vad else None,
+    }
+
+# Segments and language recovered from a checkpoint sidecar, plus the byte
+# offset just past its last complete line, where appending resumes
+Checkpoint = namedtuple("Checkpoint", ["segments", "language", "language_probability", "end", "size"])
+
+def load_checkpoint(file_path, args):
+    """Reads the checkpoint for file_path, or returns None if there is none or it doesn't match this run.
+
+    The first line holds the settings and detected language, every further
+    line one segment. A torn last line (crash mid-write) is ignored, and
+    the returned size excludes it so the writer can cut it off.
+    """
+    path = checkpoint_path(file_path, args)
+    try:
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            size = f.tell()
+            segments = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    seg = json.loads(line)
+                except ValueError:
+                    break
+                segments.append(CachedSegment(seg["start"], seg["end"], seg["text"]))
+                size += len(line)
+    except (OSError, ValueError):
+        return None
+
+    if header.get("settings") != checkpoint_settings(file_path, args):
+        print(f"{Fore.YELLOW}⚠️  Ignoring checkpoint {path}: the source file or settings changed{Style.RESET_ALL}")
+        return None
+    if not segments:
+        return None
+    return Checkpoint(segments, header["language"], header["language_probability"], segments[-1].end, size)
+
+class CheckpointWriter(SegmentWriter):
+    """Appends every decoded segment to the checkpoint sidecar so a crashed run can resume.
+
+    Segments are flushed as they arrive and fsync'ed at most every
+    `interval` seconds, so a lost machine costs at most that much work.
+    The sidecar is deleted once the outputs are complete.
+    """
+
+    def __init__(self, file_path, args, resumed=None):
+        self.path = checkpoint_path(file_path, args)
+        self.tmp_path = self.path
+        self.settings = checkpoint_settings(file_path, args)
+        self.resumed = resumed is not None
+        self.interval = args.checkpoint_interval
+        self.last_sync = time.time()
+        # A resumed checkpoint already has its header and earlier segments;
+        # a torn last line is cut off so new segments don't run into it
+        if self.resumed:
+            os.truncate(self.path, resumed.size)
+        self.f = open(self.path, "a" if self.resumed else "w", encoding="utf-8")
+
+    def begin(self, info):
+        if not self.resumed:
+            self.f.write(json.dumps({"settings": self.settings, "language": info.language, "language_probability": info.language_probability}) + "\n")
+            self.f.flush()
+
+    def write(self, seg):
+        self.f.write(json.dumps({"start": seg.start, "end": seg.end, "text": seg.text}) + "\n")
+        self.f.flush()
+        if time.time() - self.last_sync >= self.interval:
+            os.fsync(self.f.fileno())
+            self.last_sync = time.time()
 
-    if args.language is None:
+    def close(self, info=None):
+        self.f.close()
+        os.remove(self.path)
+
+    def abort(self):
+        self.f.close()
+
+def open_writers(file_path, args, cache_key=None):
+    """Opens a streaming writer for every requested format, plus a cache entry when cache_key is set."""
+    paths = output_paths(file_path, args)
+    if paths:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    writers = [OUTPUT_WRITERS[fmt](path) for fmt, path in paths.items()]
+    # Server jobs have no --stdout option
+    if getattr(args, "stdout", "text") == "ndjson":
+        writers.append(NdjsonWriter(file_path))
+    if cache_key:
+        writers.append(CacheWriter(args.cache_dir, cache_key, args.cache_max_mb * 1024 * 1024))
+    return writers
+
+def close_writers(writers, info, quiet=False):
+    """Finalizes every writer and reports the output files."""
+    if not quiet:
+        print(f"\n{Fore.CYAN}💾 Finalizing output files...{Style.RESET_ALL}")
+    for writer in writers:
+        with METRICS.phase(writer_phase(writer)):
+            writer.close(info)
+        if writer.label and not quiet:
+            print(f"{Fore.GREEN}✔ {writer.label} saved: {writer.path}")
+
+def write_outputs(segment_list, file_path, args, quiet=False, info=None):
+    """Writes every requested format for an already finished segment list (e.g. a cache hit)."""
+    writers = open_writers(file_path, args)
+    for segment in segment_list:
+        for writer in writers:
+            writer.write(segment)
+    close_writers(writers, info, quiet)
+    mark_complete(file_path, args)
+    if info is not None:
+        record_file(info, 0.0, status="cached")
+
+def vad_parameters(args):
+    """Silero VAD options given on the command line; unset ones keep faster-whisper's defaults."""
+    parameters = {
+        "threshold": args.vad_threshold,
+        "min_silence_duration_ms": args.vad_min_silence_ms,
+        "speech_pad_ms": args.vad_speech_pad_ms,
+    }
+    return {name: value for name, value in parameters.items() if value is not None}
+
+def detect_language(model, audio, args):
+    """Returns (language, probability, all_language_probs) like WhisperModel.detect_language().
+
+    By default the first 30 s are used as transcribe() would, with VAD (--vad
+    or the batched pipeline) considering only speech. With --language_windows
+    short speech stretches from across the file are used instead.
+    """
+    if args.language_windows > 0:
+        return model.detect_language(language_sample(audio, args.language_windows, decode_vad_options(args)))
+    if not (args.vad or args.batch_size > 1):
+        return model.detect_language(audio[:30 * 16000])
+    return model.detect_language(speech_prefix(audio, decode_vad_options(args)))
+
+def decode_vad_options(args):
+    """The VadOptions the decode path will use: --vad's, or the batched pipeline's own defaults."""
+    from faster_whisper.vad import VadOptions
+
+    if args.batch_size <= 1:
+        return VadOptions(**vad_parameters(args))
+    # BatchedInferencePipeline caps speech chunks at its 30 s window, and
+    # without --vad also splits on shorter silences
+    if args.vad:
+        return VadOptions(**vad_parameters(args), max_speech_duration_s=30)
+    return VadOptions(max_speech_duration_s=30, min_silence_duration_ms=160)
+
+def speech_prefix(audio, vad_options, sampling_rate=16000, target_seconds=30, block_seconds=120):
+    """Returns the first target_seconds of speech in audio.
+
+    VAD runs over block_seconds of audio at a time and stops once enough
+    speech has been found, so language detection doesn't scan a multi-hour
+    file that transcribe() is about to scan again.
+    """
+    import numpy as np
+    from faster_whisper.vad import get_speech_timestamps
+
+    speech = []
+    found = 0
+    target = int(target_seconds * sampling_rate)
+    block = block_seconds * sampling_rate
+    for offset in range(0, len(audio), block):
+        for chunk in get_speech_timestamps(audio[offset:offset + block], vad_options, sampling_rate):
+            speech.append(audio[offset + chunk["start"]:offset + chunk["end"]])
+            found += chunk["end"] - chunk["start"]
+        if found >= target:
+            break
+    if not speech:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(speech)[:target]
+
+def language_sample(audio, windows, vad_options, sampling_rate=16000, total_seconds=30):
+    """Joins the first speech of each of `windows` equal parts of the audio into one clip of at most 30 s.
+
+    Detection then sees speech from across the whole file in a single
+    encoder pass, instead of only the first 30 s (which is often an intro,
+    hold music or silence). Each part is only scanned by VAD until its share
+    of speech is found; parts without speech contribute nothing.
+    """
+    import numpy as np
+
+    if len(audio) <= total_seconds * sampling_rate:
+        return audio
+    pieces = []
+    for index in range(windows):
+        part = audio[index * len(audio) // windows:(index + 1) * len(audio) // windows]
+        pieces.append(speech_prefix(part, vad_options, sampling_rate, target_seconds=total_seconds / windows))
+    sample = np.concatenate(pieces)
+    # No speech anywhere: detect on the start of the file as usual
+    return sample if len(sample) else audio[:total_seconds * sampling_rate]
+
+class LanguageDetector:
+    """Language detection shared by every file of a run, with caching and pinning.
+
+    Detected languages are cached by audio hash (in <cache_dir>/languages.json),
+    so a file is never detected twice. With --language_pin N, the language is
+    pinned for the rest of the batch once N files in a row agree, and a
+    source directory whose last N files agreed skips detection in later runs
+    too. Results from --language_windows are cached separately from plain
+    detection. Worker processes each pin on their own, and merge their
+    results into languages.json on every write.
+    """
+
+    MAX_ENTRIES = 10000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cache = None
+        self.cache_path = None
+        self.recent = []
+        self.pinned = None
+
+    def detect(self, model, audio, args, file_path=None):
+        """Returns (language, probability, all_language_probs), detecting only when nothing cached or pinned applies."""
+        cacheable = file_path is not None and not is_stream_input(file_path) and not getattr(args, "no_cache", True)
+        with self.lock:
+            if self.pinned:
+                METRICS.count("language_detections", source="pinned")
+                return self.pinned
+        # Hashed outside the lock so concurrent server jobs don't wait on each other's reads
+        hash_key = self.hash_key(file_path, args) if cacheable else None
+        if cacheable:
+            with self.lock:
+                known = self.lookup(hash_key, file_path, args)
+            if known:
+                return known
+
+        with METRICS.phase("language_detection"):
+            detected = detect_language(model, audio, args)
+        METRICS.count("language_detections", source="model")
+
+        with self.lock:
+            if cacheable:
+                self.store(hash_key, file_path, detected, args)
+            if args.language_pin:
+                self.recent = (self.recent + [detected[0]])[-args.language_pin:]
+                if len(self.recent) == args.language_pin and len(set(self.recent)) == 1:
+                    self.pinned = detected
+                    print(f"{Fore.YELLOW}📌 Pinning language '{detected[0]}' for the rest of the batch after {args.language_pin} files agreed{Style.RESET_ALL}")
+        return detected
+
+    @staticmethod
+    def hash_key(file_path, args):
+        key = "hash:" + hash_file(file_path)
+        if args.language_windows > 0:
+            key += f":windows{args.language_windows}"
+        return key
+
+    def load(self, args, reload=False):
+        if reload or self.cache is None or self.cache_path != args.cache_dir:
+            self.cache_path = args.cache_dir
+            try:
+                with open(os.path.join(args.cache_dir, "languages.json"), "r", encoding="utf-8") as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError):
+                self.cache = {}
+        return self.cache
+
+    def lookup(self, hash_key, file_path, args):
+        cache = self.load(args)
+        entry = cache.get(hash_key)
+        if entry:
+            METRICS.count("language_detections", source="hash_cache")
+            return entry["language"], entry["probability"], None
+        entry = cache.get("dir:" + os.path.dirname(os.path.abspath(file_path)))
+        if args.language_pin and entry and entry["streak"] >= args.language_pin:
+            METRICS.count("language_detections", source="directory")
+            return entry["language"], entry["probability"], None
+        return None
+
+    def store(self, hash_key, file_path, detected, args):
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None  # Windows: concurrent workers may drop each other's entries
+
+        path = os.path.join(args.cache_dir, "languages.json")
+        os.makedirs(args.cache_dir, exist_ok=True)
+        with open(path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Re-read under the lock: other worker processes may have written entries since this one loaded the file
+            cache = self.load(args, reload=True)
+            language, probability, _ = detected
+            cache[hash_key] = {"language": language, "probability": probability}
+            dir_key = "dir:" + os.path.dirname(os.path.abspath(file_path))
+            previous = cache.pop(dir_key, None)
+            streak = previous["streak"] + 1 if previous and previous["language"] == language else 1
+            cache[dir_key] = {"language": language, "probability": probability, "streak": streak}
+            # Entries are kept in insertion order, so the oldest go first
+            for key in list(cache)[:max(0, len(cache) - self.MAX_ENTRIES)]:
+                del cache[key]
+
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, path)
+
+# Shared by every file transcribed in this process
+LANGUAGE_DETECTOR = LanguageDetector()
+
+def start_transcription(model, audio, args, initial_prompt=None, word_timestamps=False, file_path=None):
+    """Starts decoding and returns faster-whisper's lazy (segments, info) pair.
+
+    With --batch_size > 1 the audio is split into VAD chunks that are decoded
+    in batches by BatchedInferencePipeline instead of one 30-second window at
+    a time. With --vad, silence is removed before decoding. Without
+    --language, the language is detected first as a separate step by
+    LANGUAGE_DETECTOR, so its cost is timed on its own and file_path's result
+    can be cached.
+    """
+    options = {
+        "language": args.language,
+        "beam_size": args.beam_size,
+    }
+    detected = None
+    if args.language is None and model.model.is_multilingual:
+        detected = LANGUAGE_DETECTOR.detect(model, audio, args, file_path)
+        options["language"] = detected[0]
+    if initial_prompt:
+        options["initial_prompt"] = initial_prompt
+    if word_timestamps:
+        options["word_timestamps"] = True
+    if args.vad:
+        options["vad_filter"] = True
+        options["vad_parameters"] = vad_parameters(args)
+
+    with METRICS.phase("transcribe_setup"):
+        if args.batch_size > 1:
+            from faster_whisper import BatchedInferencePipeline
+
+            # The batched pipeline always splits on VAD; --vad only tunes it
+            segments, info = BatchedInferencePipeline(model).transcribe(audio, batch_size=args.batch_size, **options)
+        else:
+            segments, info = model.transcribe(audio, **options)
+    if detected:
+        # transcribe() reports a passed-in language with probability 1
+        info = dataclasses.replace(info, language_probability=detected[1], all_language_probs=detected[2])
+    return segments, info
+
+def needs_refinement(seg, args):
+    """True when a draft segment looks unreliable: low average log probability, probably silence, or repetitive text."""
+    return (
+        seg.avg_logprob < args.cascade_logprob
+        or seg.no_speech_prob > args.cascade_no_speech
+        or seg.compression_ratio > args.cascade_compression
+    )
+
+def cascade_segments(model, audio, segments, info, args, stats):
+    """Passes --cascade draft segments through, re-decoding each run of flagged ones with model.
+
+    A run is replaced by model's transcript of the whole gap between the
+    confirmed segments around it, so words the draft placed slightly wrong
+    are not cut off. The last confirmed line is used as the prompt. stats
+    collects the draft segment count and the re-decoded segments and seconds.
+    """
+    refine_args = argparse.Namespace(**vars(args))
+    refine_args.language = info.language
+    # The clips are short; the batched pipeline would only add VAD overhead
+    refine_args.batch_size = 1
+
+    flagged = []
+    confirmed_end, prompt = 0.0, None
+    for seg in chain(segments, [None]):
+        if seg is not None:
+            stats["segments"] += 1
+            if needs_refinement(seg, args):
+                flagged.append(seg)
+                continue
+        if flagged:
+            start = min(confirmed_end, flagged[0].start)
+            end = max(seg.start if seg is not None else info.duration, flagged[-1].end)
+            clip = audio[int(start * 16000):int(end * 16000)]
+            with METRICS.phase("cascade_refine"):
+                refined, _ = start_transcription(model, clip, refine_args, initial_prompt=prompt)
+                refined = [CachedSegment(start + r.start, min(start + r.end, end), r.text) for r in refined]
+            stats["redecoded_segments"] += len(flagged)
+            stats["redecoded_seconds"] += end - start
+            METRICS.count("cascade_redecoded_segments", len(flagged))
+            METRICS.count("cascade_redecoded_seconds", end - start)
+            yield from refined
+            flagged = []
+        if seg is not None:
+            confirmed_end, prompt = seg.end, seg.text.strip()
+            yield seg
+
+def transcribe_file(model, file_path, args, writers, quiet=False, audio=None, resume=None, draft_model=None):
+    """Transcribes a single file, handing each segment to every writer as soon as it is decoded.
+
+    Returns (info, transcribe_time). audio may hold samples that were already
+    decoded (e.g. prefetched); otherwise the file is decoded here. With a
+    resume checkpoint, decoding starts at the end of its last segment, in its
+    language and with its last lines as the prompt. With a draft_model
+    (--cascade), the file is decoded greedily by draft_model and only the
+    segments it is unsure about are decoded again by model. With quiet=True the
+    progress bar and status lines are suppressed, which is what worker
+    processes use so their output doesn't interleave.
+    """
+    offset = 0.0
+    if resume:
+        offset = resume.end
+        args = argparse.Namespace(**vars(args))
+        args.language = resume.language
+        if not quiet:
+            print(f"{Fore.CYAN}⏯️  Resuming from checkpoint at {format_srt_timestamp(offset)} ({len(resume.segments)} segments already decoded){Style.RESET_ALL}")
+    elif args.language is None and not quiet:
         print(f"{Fore.YELLOW}🤔 Detecting language... (Use --language to force a specific language){Style.RESET_ALL}")
 
     transcribe_start_time = time.time()
-    segments, info = model.transcribe(
-        args.file,
-        language=args.language,
-        beam_size=args.beam_size
-    )
+    if audio is None:
+        audio = load_audio(file_path, args)
+    with profiled():
+        if resume:
+            # Slice instead of passing clip_timestamps: faster-whisper ignores the VAD filter when clips are given
+            audio = audio[int(offset * 16000):]
+            initial_prompt = " ".join(seg.text.strip() for seg in resume.segments[-5:])
+            segments, info = start_transcription(model, audio, args, initial_prompt=initial_prompt)
+            segments = (CachedSegment(seg.start + offset, seg.end + offset, seg.text) for seg in segments)
+            info = CachedInfo(resume.language, resume.language_probability, info.duration + offset, info.duration_after_vad + offset)
+        elif draft_model is not None:
+            draft_args = argparse.Namespace(**vars(args))
+            draft_args.beam_size = 1
+            segments, info = start_transcription(draft_model, audio, draft_args, file_path=file_path)
+            cascade_stats = {"segments": 0, "redecoded_segments": 0, "redecoded_seconds": 0.0}
+            segments = cascade_segments(model, audio, segments, info, args, cascade_stats)
+        else:
+            segments, info = start_transcription(model, audio, args, file_path=file_path)
 
-    if args.language is None:
+    if args.language is None and not quiet:
         print(f"{Fore.YELLOW}🌍 Detected language: {info.language} (Confidence: {info.language_probability:.2f}){Style.RESET_ALL}")
 
-    segment_list = []
+    for writer in writers:
+        writer.begin(info)
+
     total_duration = round(info.duration, 2)
-    last_pos = 0
+    last_pos = offset
 
-    with tqdm(total=total_duration, unit='s', bar_format='{l_bar}{bar}| {n:.2f}/{total:.2f} [{elapsed}<{remaining}, {rate_fmt}]') as pbar:
-        for segment in segments:
-            segment_list.append(segment)
+    with profiled(), tqdm(total=total_duration, initial=offset, unit='s', disable=quiet, bar_format='{l_bar}{bar}| {n:.2f}/{total:.2f} [{elapsed}<{remaining}, {rate_fmt}]') as pbar:
+        for segment in timed_segments(segments):
+            for writer in writers:
+                with METRICS.phase(writer_phase(writer)):
+                    writer.write(segment)
             pbar.update(segment.end - last_pos)
             last_pos = segment.end
         if pbar.n < total_duration: # Ensure bar completes
@@ -238,28 +1464,1624 @@ def main():
     transcribe_time = transcribe_end_time - transcribe_start_time
     transcription_speed = total_duration / transcribe_time if transcribe_time > 0 else 0
 
-    print(f"\n{Fore.YELLOW}🚀 Transcription speed: {transcription_speed:.2f} audio seconds/s{Style.RESET_ALL}")
+    if not quiet:
+        print(f"\n{Fore.YELLOW}🚀 Transcription speed: {transcription_speed:.2f} audio seconds/s{Style.RESET_ALL}")
+        skipped = info.duration - info.duration_after_vad
+        if skipped > 0:
+            # The speed above counts skipped silence as processed audio; report the speech-only rate as well
+            speech_speed = info.duration_after_vad / transcribe_time if transcribe_time > 0 else 0
+            skipped_percent = 100 * skipped / info.duration if info.duration > 0 else 0
+            print(f"{Fore.YELLOW}🔇 VAD skipped {skipped:.2f}s of silence ({skipped_percent:.0f}%), decoded {info.duration_after_vad:.2f}s of speech at {speech_speed:.2f} speech seconds/s{Style.RESET_ALL}")
+        if draft_model is not None:
+            redecoded_percent = 100 * cascade_stats["redecoded_seconds"] / info.duration if info.duration > 0 else 0
+            rtf = transcribe_time / info.duration if info.duration > 0 else 0
+            print(f"{Fore.YELLOW}🪜 Cascade: re-decoded {cascade_stats['redecoded_segments']}/{cascade_stats['segments']} segments, {cascade_stats['redecoded_seconds']:.2f}s of audio ({redecoded_percent:.0f}%) with '{args.model_size}'; effective RTF {rtf:.3f}{Style.RESET_ALL}")
+    return info, transcribe_time
 
-    base_filename = os.path.splitext(os.path.basename(args.file))[0]
-    os.makedirs(args.output_dir, exist_ok=True)
-    formats = [fmt.strip().lower() for fmt in args.formats.split(",")]
+def transcribe_to_outputs(model, file_path, args, cache_key=None, quiet=False, extra_writers=(), audio=None, draft_model=None):
+    """Streams one file's transcript into every requested output. Returns (info, transcribe_time).
+
+    Writers are closed once the file is done; if transcription fails they are
+    aborted instead, so the cache never records a partial transcript.
+    """
+    writers = open_writers(file_path, args, cache_key) + list(extra_writers)
+    resume = None
+    try:
+        if args.checkpoint and not is_stream_input(file_path):
+            resume = load_checkpoint(file_path, args)
+            if resume:
+                # Rebuild the outputs from the checkpoint, then keep appending to it
+                for seg in resume.segments:
+                    for writer in writers:
+                        writer.write(seg)
+            writers.append(CheckpointWriter(file_path, args, resume))
+        info, transcribe_time = transcribe_file(model, file_path, args, writers, quiet, audio, resume, draft_model)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    with profiled():
+        close_writers(writers, info, quiet)
+    mark_complete(file_path, args)
+    record_file(info, transcribe_time)
+    return info, transcribe_time
+
+def available_cores():
+    """Number of CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
 
-    print(f"\n{Fore.CYAN}💾 Writing output files...{Style.RESET_ALL}")
+def worker_cpu_threads(args, device, workers):
+    """CPU threads per model when several models share the machine."""
+    tuned_workers = getattr(args, "autotune_workers", None)
+    if device == "cpu" and tuned_workers and workers != tuned_workers:
+        # The profile's thread count was tuned for its own worker count (e.g.
+        # fewer files than workers); keep its total thread budget instead
+        return max(1, tuned_workers * args.cpu_threads // workers)
+    if device == "cpu" and args.cpu_threads == 0:
+        # Split the cores evenly instead of letting every model grab all of them
+        return max(1, available_cores() // workers)
+    return args.cpu_threads
 
-    if "srt" in formats:
-        srt_path = os.path.join(args.output_dir, base_filename + ".srt")
-        write_srt(segment_list, srt_path)
-        print(f"{Fore.GREEN}✔ SRT saved: {srt_path}")
+def single_cpu_threads(args, device):
+    """CPU threads for the one model of run_batch() or run_streams().
 
-    if "json" in formats:
-        json_path = os.path.join(args.output_dir, base_filename + ".json")
-        write_json(segment_list, json_path)
-        print(f"{Fore.GREEN}✔ JSON saved: {json_path}")
+    When --cpu_threads came from a multi-worker autotune profile (e.g. cache
+    hits left a single file), the profile's single-file thread count is used.
+    """
+    if device == "cpu" and getattr(args, "autotune_workers", None):
+        return args.autotune_single_cpu_threads
+    return args.cpu_threads
 
-    if "txt" in formats:
-        txt_path = os.path.join(args.output_dir, base_filename + ".txt")
-        write_txt(segment_list, txt_path)
-        print(f"{Fore.GREEN}✔ TXT saved: {txt_path}")
+def autotune_profile_path(args):
+    """Per-host file with the --autotune results, so hosts sharing a cache directory don't overwrite each other."""
+    import socket
+
+    return os.path.join(args.cache_dir, "autotune", socket.gethostname() + ".json")
+
+def autotune_key(args, compute_type):
+    return f"{args.model_size}/{compute_type}/beam{args.beam_size}"
+
+def load_autotune_profile(args, compute_type):
+    """The tuned configuration for this host and model settings, or None if there is none or the core count changed."""
+    try:
+        with open(autotune_profile_path(args), "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    entry = profile.get(autotune_key(args, compute_type))
+    if not entry or entry.get("cores") != available_cores():
+        return None
+    return entry
+
+def save_autotune_profile(args, compute_type, entry):
+    path = autotune_profile_path(args)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        profile = {}
+    profile[autotune_key(args, compute_type)] = entry
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+
+def calibration_worker(audio, args, compute_type, cpu_threads, barrier, result_queue):
+    """Loads a model, waits until every worker of the trial has loaded theirs, then times one transcription."""
+    try:
+        model = load_model(args.model_size, "cpu", compute_type, cpu_threads)
+        barrier.wait(timeout=600)
+        start = time.perf_counter()
+        segments, _ = model.transcribe(audio, language=args.language, beam_size=args.beam_size)
+        for _ in segments:
+            pass
+        result_queue.put(time.perf_counter() - start)
+    except Exception as e:
+        barrier.abort()
+        result_queue.put(e)
+
+def wait_for_calibration(processes, result_queue):
+    """Collects one result per calibration worker, like wait_for_result() does for sweeps.
+
+    If a worker dies without a result (e.g. killed for running out of
+    memory), the rest of the trial is stopped, since they would otherwise
+    wait at the barrier, and the trial fails with an error.
+    """
+    results = []
+    while len(results) < len(processes):
+        try:
+            results.append(result_queue.get(timeout=1))
+        except queue.Empty:
+            crashed = [process for process in processes if process.exitcode not in (None, 0)]
+            if not crashed and not any(process.is_alive() for process in processes):
+                # Every worker exited cleanly; their results may have landed just after the timeout
+                try:
+                    results.append(result_queue.get(timeout=1))
+                    continue
+                except queue.Empty:
+                    pass
+            if crashed or not any(process.is_alive() for process in processes):
+                for process in processes:
+                    if process.is_alive():
+                        process.terminate()
+                code = crashed[0].exitcode if crashed else 0
+                return results + [RuntimeError(f"calibration process exited with code {code} without a result")]
+    return results
+
+def calibration_splits(cores):
+    """(workers, cpu_threads) trials: powers-of-two worker counts, each using all cores or half of them."""
+    splits = []
+    workers = 1
+    while workers <= min(cores, 8):
+        for cpu_threads in sorted({cores // workers, max(1, cores // (2 * workers))}, reverse=True):
+            splits.append((workers, cpu_threads))
+        workers *= 2
+    return splits
+
+def autotune(args, compute_type, files):
+    """Times short concurrent transcriptions for several worker/thread splits and saves the fastest to the host profile.
+
+    The calibration clip is the first --autotune_seconds of the first input
+    file, or synthetic audio when there is none. Throughput is measured after
+    every model has loaded, as audio seconds transcribed per wall second
+    across all workers. Returns the saved profile entry.
+    """
+    from faster_whisper import decode_audio
+
+    samples = int(args.autotune_seconds * 16000)
+    audio = None
+    if files and not is_stream_input(files[0]):
+        audio = decode_audio(files[0])[:samples]
+    if audio is None or len(audio) < 16000:
+        audio = synthetic_clip(args.autotune_seconds, seed=0)
+    duration = len(audio) / 16000
+
+    cores = available_cores()
+    print(f"{Fore.CYAN}🎛️  Autotuning on {cores} cores with a {duration:.0f}s clip...{Style.RESET_ALL}")
+    trials = []
+    for workers, cpu_threads in calibration_splits(cores):
+        barrier = multiprocessing.Barrier(workers)
+        result_queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=calibration_worker, args=(audio, args, compute_type, cpu_threads, barrier, result_queue)) for _ in range(workers)]
+        for process in processes:
+            process.start()
+        results = wait_for_calibration(processes, result_queue)
+        for process in processes:
+            process.join()
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            print(f"{Fore.RED}✘ {workers} workers × {cpu_threads} threads: {errors[0]}{Style.RESET_ALL}")
+            continue
+        throughput = workers * duration / max(results)
+        trials.append({"workers": workers, "cpu_threads": cpu_threads, "throughput": round(throughput, 3)})
+        print(f"   {workers} workers × {cpu_threads} threads: {throughput:.2f} audio seconds/s")
+
+    if not trials:
+        raise RuntimeError("every autotune trial failed")
+    best = max(trials, key=lambda trial: trial["throughput"])
+    single = max((trial for trial in trials if trial["workers"] == 1), key=lambda trial: trial["throughput"])
+    entry = {
+        "cores": cores,
+        "workers": best["workers"],
+        "cpu_threads": best["cpu_threads"],
+        "single_cpu_threads": single["cpu_threads"],
+        "trials": trials,
+        "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    save_autotune_profile(args, compute_type, entry)
+    print(f"{Fore.GREEN}🎛️  Best: {best['workers']} workers × {best['cpu_threads']} threads for batches, {single['cpu_threads']} threads for single files (saved to {autotune_profile_path(args)}){Style.RESET_ALL}")
+    return entry
+
+def apply_autotune_profile(args, entry, parallel):
+    """Fills in --workers and --cpu_threads from the host profile where they weren't given.
+
+    parallel is whether this run can use several workers (more than one file,
+    or chunked splitting); otherwise the best single-process thread count is used.
+    """
+    if args.workers is None:
+        args.workers = entry["workers"] if parallel else 1
+    if args.cpu_threads == 0:
+        if args.workers == entry["workers"] and args.workers > 1:
+            args.cpu_threads = entry["cpu_threads"]
+            # Lets worker_cpu_threads() and single_cpu_threads() adjust it if fewer workers end up running
+            args.autotune_workers = entry["workers"]
+            args.autotune_single_cpu_threads = entry["single_cpu_threads"]
+        elif args.workers == 1:
+            args.cpu_threads = entry["single_cpu_threads"]
+
+def prefetch_audio(files, args, depth):
+    """Yields (file_path, future) in order while decoding up to depth files ahead on background threads.
+
+    The future resolves to the decoded samples. With depth=0 it is None and
+    the file is decoded when it is transcribed.
+    """
+    if depth <= 0:
+        for file_path in files:
+            yield file_path, None
+        return
+
+    with ThreadPoolExecutor(max_workers=depth) as executor:
+        upcoming = iter(files)
+        in_flight = deque((file_path, executor.submit(load_audio, file_path, args)) for file_path in islice(upcoming, depth + 1))
+        while in_flight:
+            file_path, future = in_flight.popleft()
+            yield file_path, future
+            # The previous file is done; top the queue back up to `depth` files ahead
+            next_path = next(upcoming, None)
+            if next_path is not None:
+                in_flight.append((next_path, executor.submit(load_audio, next_path, args)))
+
+def run_batch(files, args, device, compute_type, cache_keys=None):
+    """Transcribes files one after another with a single model. Returns (total_audio, failed).
+
+    The next --prefetch files are decoded in the background while the current
+    one is being transcribed.
+    """
+    # The model is loaded once and reused for every input file
+    cpu_threads = single_cpu_threads(args, device)
+    model = get_model(args.model_size, device, compute_type, cpu_threads)
+    draft_model = get_model(args.cascade, device, compute_type, cpu_threads) if args.cascade else None
+    cache_keys = cache_keys or {}
+
+    total_audio = 0.0
+    failed = []
+
+    depth = args.prefetch if len(files) > 1 else 0
+    for index, (file_path, decoded) in enumerate(prefetch_audio(files, args, depth), 1):
+        if len(files) > 1:
+            print(f"\n{Fore.GREEN}📥 [{index}/{len(files)}] {file_path}{Style.RESET_ALL}")
+        try:
+            audio = decoded.result() if decoded is not None else None
+            info, _ = transcribe_to_outputs(model, file_path, args, cache_keys.get(file_path), audio=audio, draft_model=draft_model)
+        except Exception as e:
+            record_error(e)
+            # In batch mode one bad file must not abort the remaining ones
+            if len(files) == 1:
+                raise
+            print(f"{Fore.RED}✘ Failed to transcribe {file_path}: {e}{Style.RESET_ALL}")
+            failed.append(file_path)
+            continue
+        total_audio += info.duration
+
+    return total_audio, failed
+
+def probe_duration(file_path):
+    """Reads the duration in seconds from the container header without decoding any audio.
+
+    Returns None when the container doesn't record a duration, and for
+    stdin/named pipes, which must not be read ahead of their transcription.
+    """
+    import av
+
+    if is_stream_input(file_path):
+        return None
+    try:
+        with av.open(file_path, metadata_errors="ignore") as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0] if container.streams.audio else None
+            if stream is not None and stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+    except Exception:
+        pass
+    return None
+
+def schedule_longest_first(files):
+    """Orders files longest-first so the biggest jobs start early (LPT scheduling).
+
+    Returns (ordered_files, durations). Files whose duration can't be probed are
+    ranked by size relative to the probed files, so they don't all land at the end.
+    """
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        durations = dict(zip(files, executor.map(probe_duration, files)))
+
+    # Estimate unknown durations from the average bytes per second of the probed files
+    probed = [(os.path.getsize(f), d) for f, d in durations.items() if d]
+    bytes_per_second = sum(size for size, _ in probed) / sum(d for _, d in probed) if probed else None
+    def sort_key(file_path):
+        if durations[file_path]:
+            return durations[file_path]
+        if bytes_per_second and not is_stream_input(file_path):
+            return os.path.getsize(file_path) / bytes_per_second
+        return 0.0
+
+    return sorted(files, key=sort_key, reverse=True), durations
+
+def batch_worker(worker_id, job_queue, result_queue, args, device, compute_type, cpu_threads):
+    """Worker process: loads its own model, then transcribes (file_path, cache_key) jobs until it receives None.
+
+    Every finished file is reported on result_queue as
+    (worker_id, file_path, audio_duration, transcribe_time, error, phases),
+    where phases are this worker's METRICS since its previous report.
+    """
+    try:
+        model = get_model(args.model_size, device, compute_type, cpu_threads, quiet=True)
+        draft_model = get_model(args.cascade, device, compute_type, cpu_threads, quiet=True) if args.cascade else None
+    except Exception as e:
+        METRICS.count("errors", type=type(e).__name__)
+        result_queue.put((worker_id, None, 0.0, 0.0, f"model load failed: {e}", METRICS.take()))
+        return
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+        file_path, cache_key = job
+        try:
+            info, transcribe_time = transcribe_to_outputs(model, file_path, args, cache_key, quiet=True, draft_model=draft_model)
+            result_queue.put((worker_id, file_path, info.duration, transcribe_time, None, METRICS.take()))
+        except Exception as e:
+            record_error(e)
+            result_queue.put((worker_id, file_path, 0.0, 0.0, str(e), METRICS.take()))
+
+    if PROFILER is not None:
+        # Inherited from the parent when the worker was forked
+        PROFILER.profile.dump_stats(f"{args.profile}.worker{worker_id}")
+
+def run_worker_pool(files, args, device, compute_type, cache_keys=None):
+    """Transcribes files with args.workers processes, each holding its own model.
+
+    Workers pull from a shared queue, so a slow file only holds up the worker
+    that took it. Files are probed and dispatched longest-first, and because
+    idle workers simply take the next job, a 3-hour recording doesn't end up
+    queued behind a pile of short clips on one worker. Stdin and named
+    pipes are transcribed by this process once the workers are done, since
+    a worker's stdin is /dev/null. Returns (total_audio, failed) like
+    run_batch().
+    """
+    streams = [file_path for file_path in files if is_stream_input(file_path)]
+    files = [file_path for file_path in files if file_path not in streams]
+    if not files:
+        return run_streams(streams, args, device, compute_type)
+
+    files, durations = schedule_longest_first(files)
+    known_audio = sum(d for d in durations.values() if d)
+    print(f"{Fore.CYAN}📏 Probed {len(files)} files: {timedelta(seconds=round(known_audio))} of audio, longest {timedelta(seconds=round(durations[files[0]] or 0))}{Style.RESET_ALL}")
+
+    workers = min(args.workers, len(files))
+    cpu_threads = worker_cpu_threads(args, device, workers)
+
+    print(f"{Fore.CYAN}🔊 Starting {workers} workers, each loading model '{args.model_size}' on device '{device}' with compute type '{compute_type}'" + (f" and {cpu_threads} CPU threads" if device == "cpu" else "") + f"...{Style.RESET_ALL}")
+
+    job_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+    cache_keys = cache_keys or {}
+    for file_path in files:
+        job_queue.put((file_path, cache_keys.get(file_path)))
+    for _ in range(workers):
+        job_queue.put(None)
+
+    processes = []
+    for worker_id in range(workers):
+        process = multiprocessing.Process(
+            target=batch_worker,
+            args=(worker_id, job_queue, result_queue, args, device, compute_type, cpu_threads),
+        )
+        process.start()
+        processes.append(process)
+
+    worker_stats = {worker_id: {"files": 0, "audio": 0.0, "busy": 0.0} for worker_id in range(workers)}
+    total_audio = 0.0
+    failed = []
+    reported = set()
+
+    # Progress is tracked in audio seconds, using the probed durations as the total
+    with tqdm(total=round(known_audio, 2), unit='s', bar_format='{l_bar}{bar}| {n:.2f}/{total:.2f} [{elapsed}<{remaining}, {rate_fmt}]') as pbar:
+        while len(reported) < len(files):
+            try:
+                worker_id, file_path, duration, transcribe_time, error, phases = result_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            METRICS.merge(phases)
+            if file_path is None:
+                tqdm.write(f"{Fore.RED}✘ Worker {worker_id}: {error}{Style.RESET_ALL}")
+                continue
+            reported.add(file_path)
+            if durations.get(file_path):
+                pbar.update(durations[file_path])
+            if error:
+                tqdm.write(f"{Fore.RED}✘ Failed to transcribe {file_path}: {error}{Style.RESET_ALL}")
+                failed.append(file_path)
+                continue
+            stats = worker_stats[worker_id]
+            stats["files"] += 1
+            stats["audio"] += duration
+            stats["busy"] += transcribe_time
+            total_audio += duration
+            if not durations.get(file_path):
+                pbar.total += duration
+                pbar.update(duration)
+            speed = duration / transcribe_time if transcribe_time > 0 else 0
+            tqdm.write(f"{Fore.GREEN}✔ [worker {worker_id}] {file_path} ({speed:.2f} audio seconds/s){Style.RESET_ALL}")
+
+    for process in processes:
+        process.join()
+
+    # Files never reported back (e.g. every worker died) count as failed
+    failed.extend(file_path for file_path in files if file_path not in reported)
+
+    print(f"\n{Fore.CYAN}👷 Per-worker performance:{Style.RESET_ALL}")
+    for worker_id, stats in worker_stats.items():
+        rtf = stats["busy"] / stats["audio"] if stats["audio"] > 0 else 0
+        speed = stats["audio"] / stats["busy"] if stats["busy"] > 0 else 0
+        print(f"{Fore.YELLOW}   Worker {worker_id}: {stats['files']} files, {stats['audio']:.1f}s audio in {stats['busy']:.1f}s (RTF {rtf:.3f}, {speed:.2f} audio seconds/s){Style.RESET_ALL}")
+
+    if streams:
+        stream_audio, stream_failed = run_streams(streams, args, device, compute_type)
+        total_audio += stream_audio
+        failed.extend(stream_failed)
+    return total_audio, failed
+
+def run_streams(streams, args, device, compute_type):
+    """Transcribes stdin and named pipes in this process, for run_worker_pool(). Returns (total_audio, failed)."""
+    cpu_threads = single_cpu_threads(args, device)
+    model = get_model(args.model_size, device, compute_type, cpu_threads)
+    draft_model = get_model(args.cascade, device, compute_type, cpu_threads) if args.cascade else None
+    total_audio = 0.0
+    failed = []
+    for file_path in streams:
+        print(f"\n{Fore.GREEN}📥 {file_path}{Style.RESET_ALL}")
+        try:
+            # Streams are never cached
+            info, _ = transcribe_to_outputs(model, file_path, args, draft_model=draft_model)
+        except Exception as e:
+            record_error(e)
+            print(f"{Fore.RED}✘ Failed to transcribe {file_path}: {e}{Style.RESET_ALL}")
+            failed.append(file_path)
+            continue
+        total_audio += info.duration
+    return total_audio, failed
+
+def find_split_points(audio, chunk_seconds, sampling_rate=16000, search_seconds=30):
+    """Picks cut points roughly every chunk_seconds, each moved to the quietest 100 ms nearby.
+
+    Only the audio around each target is scanned, so this stays cheap on
+    multi-hour recordings. Returns the cut times in seconds.
+    """
+    import numpy as np
+
+    duration = len(audio) / sampling_rate
+    frame = sampling_rate // 10
+    search_seconds = min(search_seconds, chunk_seconds / 4)
+    cuts = []
+    target = chunk_seconds
+    while target < duration - chunk_seconds / 2:
+        start = max(0, int((target - search_seconds) * sampling_rate))
+        window = audio[start:int((target + search_seconds) * sampling_rate)]
+        n_frames = len(window) // frame
+        if n_frames == 0:
+            break
+        energy = np.sqrt(np.mean(np.square(window[:n_frames * frame].reshape(n_frames, frame)), axis=1))
+        cut = (start + (int(np.argmin(energy)) + 0.5) * frame) / sampling_rate
+        cuts.append(cut)
+        target = cut + chunk_seconds
+    return cuts
+
+def transcribe_chunk(job):
+    """Pool task: transcribes one chunk of a long file with this process's model.
+
+    Returns (index, segments, speech_seconds, busy_seconds, phases) with
+    segment times already shifted to the position of the chunk in the full
+    file, and phases the METRICS recorded by this process since its last task.
+    """
+    index, offset, audio, args, device, compute_type, cpu_threads = job
+    if isinstance(audio, tuple):
+        # (npy_path, start_sample, end_sample): map the cached file instead of receiving a copy
+        import numpy as np
+
+        npy_path, start_sample, end_sample = audio
+        audio = np.load(npy_path, mmap_mode="r")[start_sample:end_sample]
+    model = get_model(args.model_size, device, compute_type, cpu_threads, quiet=True)
+    start = time.time()
+    with profiled():
+        segments, info = start_transcription(model, audio, args)
+        shifted = [CachedSegment(seg.start + offset, seg.end + offset, seg.text) for seg in timed_segments(segments)]
+    if PROFILER is not None:
+        # Pool workers have no exit hook, so each rewrites its cumulative stats after every chunk
+        PROFILER.profile.dump_stats(f"{args.profile}.worker{os.getpid()}")
+    return index, shifted, info.duration_after_vad, time.time() - start, METRICS.take()
+
+def detect_chunk_language(job):
+    """Pool task: runs WhisperModel.detect_language() on a worker's model for ChunkPoolModel."""
+    sample, model_size, device, compute_type, cpu_threads = job
+    model = get_model(model_size, device, compute_type, cpu_threads, quiet=True)
+    with profiled():
+        return model.detect_language(sample)
+
+class ChunkPoolModel:
+    """Stands in for a model in LANGUAGE_DETECTOR.detect() in chunked mode, where only the pool's workers hold one.
+
+    The sample to detect on is picked in the parent (first 30 s, speech
+    prefix or --language_windows), so only those samples are sent to a worker.
+    """
+
+    def __init__(self, pool, args, device, compute_type, cpu_threads):
+        self.pool = pool
+        self.job = (args.model_size, device, compute_type, cpu_threads)
+
+    def detect_language(self, sample):
+        return self.pool.apply(detect_chunk_language, ((sample,) + self.job,))
+
+def stitch_chunk(segments, keep_start, keep_end, previous, overlap):
+    """Yields the segments that belong to [keep_start, keep_end), dropping overlap duplicates.
+
+    A segment belongs to the chunk that contains its midpoint. Text repeated
+    across the overlap is dropped, and start times are clamped so the merged
+    list stays monotonic. previous is the last segment emitted so far.
+    """
+    for seg in segments:
+        midpoint = (seg.start + seg.end) / 2
+        if not keep_start <= midpoint < keep_end:
+            continue
+        if previous is not None:
+            if seg.text.strip() == previous.text.strip() and seg.start < previous.end + overlap:
+                continue
+            if seg.start < previous.end:
+                seg = CachedSegment(previous.end, max(seg.end, previous.end), seg.text)
+        yield seg
+        previous = seg
+
+def transcribe_chunked(pool, file_path, args, device, compute_type, cpu_threads, cache_key=None):
+    """Splits one file at quiet points and transcribes the chunks in parallel on pool.
+
+    Chunks overlap by --chunk_overlap seconds on each side so words at a cut
+    aren't lost. Finished chunks are stitched and streamed to the writers in
+    order as soon as every earlier chunk is done. Returns (info, transcribe_time).
+    """
+    transcribe_start_time = time.time()
+    audio = load_audio(file_path, args)
+    duration = len(audio) / 16000
+    cuts = [0.0] + find_split_points(audio, args.chunk_minutes * 60) + [duration]
+    print(f"{Fore.CYAN}✂️  Split into {len(cuts) - 1} chunks at quiet points{Style.RESET_ALL}")
+
+    chunk_args = argparse.Namespace(**vars(args))
+    language_probability = 1.0
+    if chunk_args.language is None:
+        pool_model = ChunkPoolModel(pool, args, device, compute_type, cpu_threads)
+        chunk_args.language, language_probability, _ = LANGUAGE_DETECTOR.detect(pool_model, audio, args, file_path)
+        print(f"{Fore.YELLOW}🌍 Detected language: {chunk_args.language} (Confidence: {language_probability:.2f}){Style.RESET_ALL}")
+
+    # A memory-mapped audio cache file is shared by path; otherwise each chunk's samples are sent to the worker
+    npy_path = getattr(audio, "filename", None)
+
+    def jobs():
+        for index in range(len(cuts) - 1):
+            start = max(0.0, cuts[index] - args.chunk_overlap)
+            end = min(duration, cuts[index + 1] + args.chunk_overlap)
+            start_sample, end_sample = int(start * 16000), int(end * 16000)
+            chunk_audio = (npy_path, start_sample, end_sample) if npy_path else audio[start_sample:end_sample]
+            yield index, start, chunk_audio, chunk_args, device, compute_type, cpu_threads
+
+    writers = open_writers(file_path, args, cache_key)
+    finished = {}
+    next_index = 0
+    previous = None
+    speech_seconds = 0.0
+    try:
+        with tqdm(total=round(duration, 2), unit='s', bar_format='{l_bar}{bar}| {n:.2f}/{total:.2f} [{elapsed}<{remaining}, {rate_fmt}]') as pbar:
+            for index, segments, chunk_speech, _, phases in pool.imap_unordered(transcribe_chunk, jobs()):
+                METRICS.merge(phases)
+                finished[index] = segments
+                speech_seconds += chunk_speech
+                pbar.update(cuts[index + 1] - cuts[index])
+                # Emit every chunk whose predecessors are all done
+                with profiled():
+                    while next_index in finished:
+                        for seg in stitch_chunk(finished.pop(next_index), cuts[next_index], cuts[next_index + 1], previous, args.chunk_overlap):
+                            for writer in writers:
+                                with METRICS.phase(writer_phase(writer)):
+                                    writer.write(seg)
+                            previous = seg
+                        next_index += 1
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+
+    # Overlap is decoded twice; report the speech actually in the file, not the work done
+    info = CachedInfo(chunk_args.language, language_probability, duration, min(duration, speech_seconds))
+    transcribe_time = time.time() - transcribe_start_time
+    speed = duration / transcribe_time if transcribe_time > 0 else 0
+    print(f"\n{Fore.YELLOW}🚀 Transcription speed: {speed:.2f} audio seconds/s{Style.RESET_ALL}")
+    with profiled():
+        close_writers(writers, info)
+    mark_complete(file_path, args)
+    record_file(info, transcribe_time)
+    return info, transcribe_time
+
+def run_chunked(files, args, device, compute_type, cache_keys=None):
+    """Transcribes files one at a time, each split into chunks shared across args.workers processes.
+
+    Returns (total_audio, failed) like run_batch().
+    """
+    cpu_threads = worker_cpu_threads(args, device, args.workers)
+    cache_keys = cache_keys or {}
+    print(f"{Fore.CYAN}🔊 Starting {args.workers} workers, each loading model '{args.model_size}' on device '{device}' with compute type '{compute_type}'" + (f" and {cpu_threads} CPU threads" if device == "cpu" else "") + f"...{Style.RESET_ALL}")
+
+    total_audio = 0.0
+    failed = []
+    with multiprocessing.Pool(args.workers) as pool:
+        for index, file_path in enumerate(files, 1):
+            if len(files) > 1:
+                print(f"\n{Fore.GREEN}📥 [{index}/{len(files)}] {file_path}{Style.RESET_ALL}")
+            try:
+                info, _ = transcribe_chunked(pool, file_path, args, device, compute_type, cpu_threads, cache_keys.get(file_path))
+            except Exception as e:
+                record_error(e)
+                if len(files) == 1:
+                    raise
+                print(f"{Fore.RED}✘ Failed to transcribe {file_path}: {e}{Style.RESET_ALL}")
+                failed.append(file_path)
+                continue
+            total_audio += info.duration
+    return total_audio, failed
+
+# Options a server job may override, with the type of the matching CLI
+# argument; everything else comes from the `serve` command line
+JOB_OPTIONS = {
+    "language": str,
+    "beam_size": int,
+    "batch_size": int,
+    "vad": bool,
+    "formats": str,
+    "output_dir": str,
+    "model_size": str,
+    "compute_type": str,
+}
+
+def job_options(job):
+    """Checks and converts the JOB_OPTIONS given in a job. Raises ValueError with a message for the client."""
+    options = {}
+    for name, option_type in JOB_OPTIONS.items():
+        if name not in job:
+            continue
+        value = job[name]
+        if name == "language" and value is None:
+            pass  # Auto-detect, as when --language is not given
+        elif option_type is int:
+            # Accept "5" as the command line would, but not true/false or 5.5
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise ValueError(f"'{name}' must be an integer")
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"'{name}' must be an integer") from None
+            if value < 1:
+                raise ValueError(f"'{name}' must be at least 1")
+        elif not isinstance(value, option_type):
+            raise ValueError(f"'{name}' must be a {'boolean' if option_type is bool else 'string'}")
+        options[name] = value
+    return options
+
+class TranscriptionService:
+    """Holds the warm model and runs jobs for the HTTP server.
+
+    At most max_concurrent jobs run at once and at most queue_size more may
+    wait for a slot; anything beyond that is rejected so callers back off
+    instead of piling up threads.
+    """
+
+    def __init__(self, args, device):
+        self.args = args
+        self.device = device
+        self.slots = threading.Semaphore(args.max_concurrent)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.start_time = time.time()
+
+    def health(self):
+        with self.lock:
+            return {
+                "status": "ok",
+                "model_size": self.args.model_size,
+                "device": self.device,
+                "loaded_models": MODEL_POOL.loaded(),
+                "active": self.active,
+                "queued": self.waiting,
+                "max_concurrent": self.args.max_concurrent,
+                "queue_size": self.args.queue_size,
+                "completed": self.completed,
+                "failed": self.failed,
+                "uptime": round(time.time() - self.start_time, 1),
+            }
+
+    def prometheus(self):
+        """/metrics: the process-wide counters and histograms plus the current queue state."""
+        with self.lock:
+            gauges = {
+                "jobs_active": self.active,
+                "jobs_queued": self.waiting,
+                "queue_capacity": self.args.max_concurrent + self.args.queue_size,
+                "models_loaded": len(MODEL_POOL.loaded()),
+                "uptime_seconds": round(time.time() - self.start_time, 1),
+            }
+        return METRICS.prometheus(gauges)
+
+    def submit(self, job):
+        """Runs a job once a slot is free. Returns (http_status, response_body)."""
+        file_path = job.get("file")
+        if not isinstance(file_path, str) or not os.path.isfile(file_path):
+            return 400, {"error": f"File not found: {file_path}"}
+        try:
+            options = job_options(job)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        with self.lock:
+            if self.active + self.waiting >= self.args.max_concurrent + self.args.queue_size:
+                METRICS.count("rejected_jobs")
+                return 503, {"error": "Server busy, retry later", "active": self.active, "queued": self.waiting}
+            self.waiting += 1
+
+        with self.slots:
+            with self.lock:
+                self.waiting -= 1
+                self.active += 1
+            try:
+                result = self.run_job(file_path, job, options)
+            except Exception as e:
+                record_error(e)
+                with self.lock:
+                    self.failed += 1
+                print(f"{Fore.RED}✘ Failed to transcribe {file_path}: {e}{Style.RESET_ALL}")
+                return 500, {"error": str(e)}
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+        with self.lock:
+            self.completed += 1
+        return 200, result
+
+    def run_job(self, file_path, job, options):
+        job_args = argparse.Namespace(**vars(self.args))
+        for name, value in options.items():
+            setattr(job_args, name, value)
+
+        compute_type = resolve_compute_type(job_args.compute_type, self.device)
+        collector = SegmentCollector()
+        cache_key = transcript_cache_key(file_path, job_args, compute_type) if not job_args.no_cache else None
+        cached = cache_load(job_args.cache_dir, cache_key) if cache_key else None
+        if cached:
+            segment_list, info = cached
+            write_outputs(segment_list, file_path, job_args, quiet=True, info=info)
+            write_segments(collector, segment_list)
+            transcribe_time = 0.0
+        else:
+            model = get_model(job_args.model_size, self.device, compute_type, job_args.cpu_threads)
+            info, transcribe_time = transcribe_to_outputs(model, file_path, job_args, cache_key, quiet=True, extra_writers=[collector])
+
+        print(f"{Fore.GREEN}✔ {file_path} ({info.duration:.1f}s audio in {transcribe_time:.1f}s{', cached' if cached else ''}){Style.RESET_ALL}")
+        return {
+            "file": file_path,
+            "language": info.language,
+            "language_probability": info.language_probability,
+            "duration": info.duration,
+            "transcribe_time": transcribe_time,
+            "cached": cached is not None,
+            "outputs": output_paths(file_path, job_args),
+            "segments": collector.segments if job.get("return_segments", True) else None,
+        }
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    """GET /health, GET /metrics and POST /transcribe with a JSON body like {"file": "...", "language": "en"}."""
+    server_version = "faster-whisper-transcriber"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, self.server.service.health())
+        elif self.path == "/metrics":
+            data = self.server.service.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/transcribe":
+            self.send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_json(400, {"error": "Request body must be JSON"})
+            return
+        if not isinstance(job, dict):
+            self.send_json(400, {"error": "Request body must be a JSON object"})
+            return
+        status, body = self.server.service.submit(job)
+        self.send_json(status, body)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix-domain socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve_main(argv):
+    """`transcribe serve`: loads the model once and transcribes jobs over a local HTTP API."""
+    parser = argparse.ArgumentParser(prog="transcribe serve", description="🛰️  Keep a Whisper model loaded and accept transcription jobs over a local HTTP API")
+    add_transcription_arguments(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--socket", help="Listen on this Unix-domain socket path instead of host/port")
+    parser.add_argument("--max_concurrent", "--max-concurrent", type=int, default=1, help="Number of jobs transcribed at the same time")
+    parser.add_argument("--queue_size", "--queue-size", type=int, default=8, help="Number of jobs that may wait for a slot before new ones are rejected with 503")
+    args = parser.parse_args(argv)
+
+    check_transcription_arguments(parser, args)
+    if args.max_concurrent < 1:
+        parser.error("--max_concurrent must be at least 1")
+    if args.language_pin:
+        # LANGUAGE_DETECTOR is shared by every client's jobs for the server's lifetime, not scoped to one batch
+        parser.error("--language_pin only applies to batch runs, not to serve")
+    MODEL_POOL.budget_bytes = args.model_cache_mb * 1024 * 1024
+
+    device = resolve_device(args.device)
+    compute_type = resolve_compute_type(args.compute_type, device)
+
+    # Jobs may ask for other model sizes or compute types; those are loaded on
+    # demand into the shared pool and evicted under --model_cache_mb
+    MODEL_POOL.num_workers = args.max_concurrent
+    get_model(args.model_size, device, compute_type, args.cpu_threads)
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixHTTPServer(args.socket, TranscriptionRequestHandler)
+        address = args.socket
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), TranscriptionRequestHandler)
+        address = f"http://{args.host}:{args.port}"
+    server.service = TranscriptionService(args, device)
+
+    print(f"{Fore.GREEN}🛰️  Listening on {address} (POST /transcribe, GET /health, GET /metrics){Style.RESET_ALL}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{Fore.CYAN}👋 Shutting down...{Style.RESET_ALL}")
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+# A word recognized in live mode, with times in seconds from the start of the stream
+LiveWord = namedtuple("LiveWord", ["start", "end", "text"])
+
+def percentile(values, q):
+    """q-th percentile (0-100) of values by linear interpolation, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+class LatencyReservoir:
+    """Word latencies of a live stream in bounded memory.
+
+    The count, maximum and number of words over the target are exact; the
+    percentiles come from a uniform sample of at most `size` latencies.
+    """
+
+    def __init__(self, target, size=10000):
+        self.target = target
+        self.size = size
+        self.sample = []
+        self.count = 0
+        self.late = 0
+        self.max = 0.0
+
+    def add(self, latency):
+        self.count += 1
+        self.late += latency > self.target
+        self.max = max(self.max, latency)
+        if len(self.sample) < self.size:
+            self.sample.append(latency)
+        else:
+            index = random.randrange(self.count)
+            if index < self.size:
+                self.sample[index] = latency
+
+    def percentile(self, q):
+        return percentile(self.sample, q)
+
+class LiveTranscriber:
+    """Transcribes a growing audio stream by re-decoding a sliding window and committing stable words.
+
+    Every process() call decodes the uncommitted tail of the stream (with
+    the last committed text as prompt) and commits the words on which this
+    hypothesis and the previous one agree (local agreement). When the
+    oldest uncommitted audio is more than max_latency seconds behind the
+    stream, the current hypothesis is committed as is, which bounds how long
+    text can stay pending. The window is trimmed to the last committed word
+    so it never grows past `window` seconds of audio.
+    """
+
+    def __init__(self, model, args, sampling_rate=16000):
+        import numpy as np
+
+        self.model = model
+        # Own copy, since the language is pinned once it has been detected
+        self.args = argparse.Namespace(**vars(args))
+        self.sampling_rate = sampling_rate
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0.0  # stream time of buffer[0]
+        self.committed_end = 0.0
+        self.committed_text = deque(maxlen=20)
+        self.pending = []  # last hypothesis beyond the committed words
+
+    @property
+    def stream_end(self):
+        return self.buffer_start + len(self.buffer) / self.sampling_rate
+
+    def feed(self, samples):
+        import numpy as np
+
+        self.buffer = np.concatenate([self.buffer, samples])
+
+    def process(self, final=False):
+        """Decodes the current window and returns the newly committed words."""
+        initial_prompt = "".join(self.committed_text).strip() or None
+        segments, info = start_transcription(self.model, self.buffer, self.args, initial_prompt=initial_prompt, word_timestamps=True)
+        hypothesis = [
+            LiveWord(self.buffer_start + word.start, self.buffer_start + word.end, word.word)
+            for segment in segments for word in (segment.words or [])
+            # Words already committed from the previous window (small tolerance for timestamp jitter)
+            if self.buffer_start + word.start >= self.committed_end - 0.05
+        ]
+
+        if final or self.stream_end - self.committed_end > self.args.max_latency:
+            committed = hypothesis
+            self.pending = []
+        else:
+            agreed = 0
+            for previous, current in zip(self.pending, hypothesis):
+                if previous.text.strip().lower() != current.text.strip().lower():
+                    break
+                agreed += 1
+            committed = hypothesis[:agreed]
+            self.pending = hypothesis[agreed:]
+
+        if committed:
+            if self.args.language is None:
+                # Detecting the language again on every short window would be slow and could flip between steps
+                self.args.language = info.language
+                print(f"{Fore.YELLOW}🌍 Detected language: {info.language} (Confidence: {info.language_probability:.2f}){Style.RESET_ALL}")
+            self.committed_end = committed[-1].end
+            self.committed_text.extend(word.text for word in committed)
+        self.trim()
+        return committed
+
+    def trim(self):
+        """Drops audio before the last committed word, keeping at most `window` seconds."""
+        cut = self.committed_end
+        if self.stream_end - cut > self.args.window:
+            # Nothing committed for a whole window (e.g. silence); keep only the latest audio
+            cut = self.stream_end - self.args.window
+        drop = int((cut - self.buffer_start) * self.sampling_rate)
+        if drop > 0:
+            self.buffer = self.buffer[drop:]
+            self.buffer_start += drop / self.sampling_rate
+
+def read_pcm(stream, chunks, sampling_rate=16000):
+    """Reader thread: turns raw s16le mono PCM from stream into (samples, arrival_time) items on chunks.
+
+    Puts None when the stream ends.
+    """
+    import numpy as np
+
+    remainder = b""
+    try:
+        while True:
+            data = stream.read1(sampling_rate // 10 * 2)
+            if not data:
+                break
+            arrival = time.monotonic()
+            data = remainder + data
+            usable = len(data) - len(data) % 2
+            remainder = data[usable:]
+            if usable:
+                chunks.put((np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0, arrival))
+    finally:
+        chunks.put(None)
+
+def open_live_input(args):
+    """Returns (source name, binary stream) for stdin or the first client of --socket."""
+    if not args.socket:
+        return "-", sys.stdin.buffer
+
+    import socket
+
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(args.socket)
+    server.listen(1)
+    print(f"{Fore.GREEN}🎙️  Waiting for a PCM stream on {args.socket}...{Style.RESET_ALL}")
+    connection, _ = server.accept()
+    server.close()
+    os.remove(args.socket)
+    return args.socket, connection.makefile("rb")
+
+def live_main(argv):
+    """`transcribe live`: transcribes a continuous PCM stream, committing text with bounded latency."""
+    parser = argparse.ArgumentParser(prog="transcribe live", description="🎙️  Transcribe a live 16 kHz mono s16le PCM stream from stdin or a Unix socket")
+    add_transcription_arguments(parser)
+    parser.add_argument("--socket", help="Read the stream from the first client of this Unix-domain socket instead of stdin")
+    parser.add_argument("--min_chunk", "--min-chunk", type=float, default=1.0, help="Seconds of new audio to collect before decoding again")
+    parser.add_argument("--max_latency", "--max-latency", type=float, default=5.0, help="Commit pending text once the oldest uncommitted audio is this many seconds old")
+    parser.add_argument("--window", type=float, default=15.0, help="Maximum seconds of audio re-decoded per step")
+    parser.add_argument("--stdout", default="text", choices=["text", "ndjson"], help="📤 'ndjson' streams one JSON record per committed segment to stdout; status output moves to stderr")
+    parser.set_defaults(formats="srt,txt", beam_size=1)
+    args = parser.parse_args(argv)
+    check_transcription_arguments(parser, args)
+
+    if args.stdout == "ndjson":
+        sys.stdout = sys.stderr
+    MODEL_POOL.budget_bytes = args.model_cache_mb * 1024 * 1024
+
+    device = resolve_device(args.device)
+    compute_type = resolve_compute_type(args.compute_type, device)
+    model = get_model(args.model_size, device, compute_type, args.cpu_threads)
+
+    source, stream = open_live_input(args)
+    chunks = queue.Queue()
+    threading.Thread(target=read_pcm, args=(stream, chunks), daemon=True).start()
+
+    transcriber = LiveTranscriber(model, args)
+    writers = open_writers(source, args)
+    # (samples received so far, arrival time of that chunk), to find when a
+    # word's audio arrived; only kept for audio still in the transcriber's buffer
+    arrivals_samples, arrivals_time = [], []
+    received = 0
+    latencies = LatencyReservoir(args.max_latency)
+
+    print(f"{Fore.CYAN}🎙️  Live: decoding every {args.min_chunk:g}s, max latency {args.max_latency:g}s (Ctrl+C to stop){Style.RESET_ALL}")
+    finished = False
+    try:
+        while not finished:
+            # Block for the first chunk, then take everything that has arrived until min_chunk seconds are new
+            new_samples = 0
+            while new_samples < args.min_chunk * 16000:
+                chunk = chunks.get()
+                if chunk is None:
+                    finished = True
+                    break
+                samples, arrival = chunk
+                transcriber.feed(samples)
+                received += len(samples)
+                new_samples += len(samples)
+                arrivals_samples.append(received)
+                arrivals_time.append(arrival)
+            if not len(transcriber.buffer):
+                continue
+
+            committed = transcriber.process(final=finished)
+            now = time.monotonic()
+            for word in committed:
+                index = min(bisect_left(arrivals_samples, int(word.end * 16000)), len(arrivals_time) - 1)
+                latency = now - arrivals_time[index]
+                latencies.add(latency)
+            # Later words are committed from the trimmed buffer, so older arrivals are never looked up again
+            drop = bisect_left(arrivals_samples, int(transcriber.buffer_start * 16000))
+            del arrivals_samples[:drop], arrivals_time[:drop]
+            if not committed:
+                continue
+            segment = CachedSegment(committed[0].start, committed[-1].end, "".join(word.text for word in committed))
+            for writer in writers:
+                writer.write(segment)
+            print(f"{Fore.GREEN}[{format_srt_timestamp(segment.start)} --> {format_srt_timestamp(segment.end)}]{Style.RESET_ALL} {segment.text.strip()} {Fore.YELLOW}(+{latency:.2f}s){Style.RESET_ALL}")
+    except KeyboardInterrupt:
+        print(f"\n{Fore.CYAN}👋 Stopping...{Style.RESET_ALL}")
+
+    duration = received / 16000
+    close_writers(writers, CachedInfo(transcriber.args.language, None, duration, duration))
+
+    if latencies.count:
+        p50, p90, p99 = (latencies.percentile(q) for q in (50, 90, 99))
+        print(f"\n{Fore.YELLOW}⏱️  End-to-end latency over {latencies.count} words: p50 {p50:.2f}s, p90 {p90:.2f}s, p99 {p99:.2f}s, max {latencies.max:.2f}s{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}🎯 {latencies.late} words ({latencies.late / latencies.count:.0%}) exceeded the {args.max_latency:g}s latency target{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}✅ Transcribed {timedelta(seconds=round(duration))} of live audio.{Style.RESET_ALL}")
+
+# Clip lengths (seconds) of the generated benchmark corpus
+SYNTHETIC_CORPUS_DURATIONS = (30, 60, 120, 300)
+
+def synthetic_clip(duration, seed, sampling_rate=16000):
+    """Deterministic mix of harmonic tones, noise and silence as float32 samples.
+
+    Contains no speech, but it runs through the same feature extraction and
+    decoding path as real audio, so it is a repeatable load for timing.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    total_samples = int(duration * sampling_rate)
+    blocks = []
+    generated = 0
+    while generated < total_samples:
+        length = int(rng.uniform(0.5, 4.0) * sampling_rate)
+        t = np.arange(length) / sampling_rate
+        kind = rng.integers(3)
+        if kind == 0:
+            # Voice-like harmonic stack with a 4 Hz "syllable" envelope
+            f0 = rng.uniform(100, 300)
+            block = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+            block *= 0.15 * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        elif kind == 1:
+            block = rng.normal(0, 0.05, length)
+        else:
+            block = np.zeros(length)
+        blocks.append(block)
+        generated += length
+    return np.concatenate(blocks)[:total_samples].astype(np.float32)
+
+def write_wav(path, audio, sampling_rate=16000):
+    """Writes float samples in [-1, 1] as a 16-bit mono WAV file."""
+    import numpy as np
+
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sampling_rate)
+        f.writeframes(pcm.tobytes())
+
+def generate_synthetic_corpus(out_dir, durations=SYNTHETIC_CORPUS_DURATIONS):
+    """Writes one deterministic clip per duration into out_dir and returns their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for seed, duration in enumerate(durations):
+        path = os.path.join(out_dir, f"synthetic_{duration}s.wav")
+        if not os.path.isfile(path):
+            write_wav(path, synthetic_clip(duration, seed))
+        paths.append(path)
+    return paths
+
+def fixed_windows(duration, window=30):
+    """Consecutive window-second clips covering the whole file, as clip_timestamps for the batched pipeline."""
+    return [{"start": start, "end": min(start + window, duration)} for start in range(0, int(duration + 0.999), window) if start < duration]
+
+def peak_rss_mb(children=False):
+    """Peak resident memory of this process (or its largest finished child) in MB.
+
+    None where the resource module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def sweep_worker(config, files, language, device, result_queue):
+    """Benchmarks one configuration in a fresh process, so its load time and peak RSS aren't skewed by earlier ones."""
+    from faster_whisper import decode_audio
+
+    try:
+        corpus = [decode_audio(file_path) for file_path in files]
+        start = time.perf_counter()
+        model = load_model(config["model_size"], device, config["compute_type"], config["cpu_threads"])
+        load_seconds = time.perf_counter() - start
+
+        busy = 0.0
+        first_segment = []
+        for audio in corpus:
+            start = time.perf_counter()
+            segments, _ = model.transcribe(audio, language=language, beam_size=config["beam_size"])
+            for index, _ in enumerate(segments):
+                if index == 0:
+                    first_segment.append(time.perf_counter() - start)
+            busy += time.perf_counter() - start
+        total_audio = sum(len(audio) / 16000 for audio in corpus)
+        result_queue.put(dict(
+            config,
+            load_seconds=round(load_seconds, 3),
+            first_segment_seconds=round(sum(first_segment) / len(first_segment), 3) if first_segment else None,
+            audio_seconds=round(total_audio, 2),
+            wall_seconds=round(busy, 3),
+            rtf=round(busy / total_audio, 4),
+            peak_rss_mb=peak_rss_mb(),
+            error=None,
+        ))
+    except Exception as e:
+        result_queue.put(dict(config, error=str(e)))
+
+def wait_for_result(process, result_queue, config):
+    """Waits for a sweep worker's result, or reports an error if it died without one (e.g. out of memory)."""
+    while True:
+        try:
+            return result_queue.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                try:
+                    return result_queue.get(timeout=1)
+                except queue.Empty:
+                    return dict(config, error=f"benchmark process exited with code {process.exitcode}")
+
+def run_sweep(files, args, device):
+    """Benchmarks every model_size × compute_type × beam_size × cpu_threads combination, one process each."""
+    def values(option, fallback, cast=str):
+        return [cast(value.strip()) for value in option.split(",")] if option else [fallback]
+
+    configs = [
+        {"model_size": model_size, "compute_type": resolve_compute_type(compute_type, device), "beam_size": beam_size, "cpu_threads": cpu_threads}
+        for model_size in values(args.model_sizes, args.model_size)
+        for compute_type in values(args.compute_types, args.compute_type)
+        for beam_size in values(args.beam_sizes, args.beam_size, int)
+        for cpu_threads in values(args.thread_counts, args.cpu_threads, int)
+    ]
+    print(f"{Fore.CYAN}📊 Sweeping {len(configs)} configurations{Style.RESET_ALL}")
+
+    # spawn instead of fork: a forked child would start with the parent's memory counted in its RSS
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+    results = []
+    for config in tqdm(configs, desc="sweep", unit="config"):
+        process = context.Process(target=sweep_worker, args=(config, files, args.language, device, result_queue))
+        process.start()
+        results.append(wait_for_result(process, result_queue, config))
+        process.join()
+        if results[-1]["error"]:
+            tqdm.write(f"{Fore.RED}✘ {config}: {results[-1]['error']}{Style.RESET_ALL}")
+    return results
+
+def print_sweep(results):
+    print(f"\n{Fore.CYAN}{'model':<12}{'compute':<14}{'beam':>5}{'threads':>8}{'load s':>9}{'first s':>9}{'RTF':>9}{'peak MB':>10}{Style.RESET_ALL}")
+    for row in results:
+        if row["error"]:
+            continue
+        first_segment = f"{row['first_segment_seconds']:.2f}" if row["first_segment_seconds"] is not None else "-"
+        peak = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "-"
+        print(f"{row['model_size']:<12}{row['compute_type']:<14}{row['beam_size']:>5}{row['cpu_threads']:>8}{row['load_seconds']:>9.2f}{first_segment:>9}{row['rtf']:>9.4f}{peak:>10}")
+
+def save_bench_results(path, results, metadata):
+    """Writes results as CSV when path ends in .csv, otherwise as JSON together with metadata."""
+    if path.lower().endswith(".csv"):
+        import csv
+
+        columns = list(dict.fromkeys(column for row in results for column in row))
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(metadata, results=results), f, indent=2)
+    print(f"{Fore.GREEN}✔ Results saved: {path}")
+
+def bench_main(argv):
+    """`transcribe bench`: compares sequential and batched decoding speed, or sweeps model settings, on a fixed corpus."""
+    parser = argparse.ArgumentParser(prog="transcribe bench", description="📊 Compare sequential and batched transcription speed on a fixed audio corpus")
+    add_transcription_arguments(parser)
+    parser.add_argument("--corpus_dir", "--corpus-dir", help="Benchmark the audio files in this directory instead of the generated synthetic corpus")
+    parser.add_argument("--output", help="Also write the results to this file (CSV if it ends in .csv, JSON otherwise)")
+    parser.add_argument("--sweep", action="store_true", help="Measure load time, first-segment latency, RTF and peak RSS for every combination of the lists below")
+    parser.add_argument("--model_sizes", "--model-sizes", help="Comma-separated model sizes to sweep (default: --model_size)")
+    parser.add_argument("--compute_types", "--compute-types", help="Comma-separated compute types to sweep (default: --compute_type)")
+    parser.add_argument("--beam_sizes", "--beam-sizes", help="Comma-separated beam sizes to sweep (default: --beam_size)")
+    parser.add_argument("--thread_counts", "--thread-counts", help="Comma-separated CPU thread counts to sweep (default: --cpu_threads)")
+    parser.set_defaults(batch_size=8, language="en")
+    args = parser.parse_args(argv)
+    check_transcription_arguments(parser, args)
+
+    from faster_whisper import BatchedInferencePipeline, decode_audio
+
+    if args.corpus_dir:
+        files = [os.path.join(args.corpus_dir, name) for name in sorted(os.listdir(args.corpus_dir)) if name.lower().endswith(AUDIO_EXTENSIONS)]
+    else:
+        files = generate_synthetic_corpus(os.path.join(default_cache_dir(), "bench-corpus"))
+    if not files:
+        print(f"{Fore.RED}No audio files to benchmark.{Style.RESET_ALL}")
+        sys.exit(1)
+
+    device = resolve_device(args.device)
+    if args.sweep:
+        results = run_sweep(files, args, device)
+        print_sweep(results)
+        if args.output:
+            save_bench_results(args.output, results, {"device": device, "files": files})
+        return
+
+    compute_type = resolve_compute_type(args.compute_type, device)
+    model = get_model(args.model_size, device, compute_type, args.cpu_threads)
+
+    # Decode up front so only inference is timed
+    corpus = [(file_path, decode_audio(file_path)) for file_path in files]
+    total_audio = sum(len(audio) / 16000 for _, audio in corpus)
+    print(f"{Fore.CYAN}📊 Corpus: {len(corpus)} files, {total_audio:.0f}s of audio{Style.RESET_ALL}")
+
+    results = []
+    for mode in ("sequential", "batched"):
+        busy = 0.0
+        for file_path, audio in tqdm(corpus, desc=mode, unit="file"):
+            start = time.perf_counter()
+            if mode == "sequential":
+                segments, _ = model.transcribe(audio, language=args.language, beam_size=args.beam_size)
+            else:
+                # Fixed 30 s windows instead of VAD, so both modes decode the same audio
+                segments, _ = BatchedInferencePipeline(model).transcribe(
+                    audio,
+                    language=args.language,
+                    beam_size=args.beam_size,
+                    batch_size=args.batch_size,
+                    clip_timestamps=fixed_windows(len(audio) / 16000)
+                )
+            for _ in segments:
+                pass
+            busy += time.perf_counter() - start
+        results.append({
+            "mode": mode,
+            "batch_size": args.batch_size if mode == "batched" else 1,
+            "audio_seconds": round(total_audio, 2),
+            "wall_seconds": round(busy, 3),
+            "rtf": round(busy / total_audio, 4),
+            "speed": round(total_audio / busy, 2),
+        })
+
+    print(f"\n{Fore.CYAN}{'mode':<12}{'batch':>6}{'wall s':>10}{'RTF':>9}{'audio s/s':>12}{Style.RESET_ALL}")
+    for row in results:
+        print(f"{row['mode']:<12}{row['batch_size']:>6}{row['wall_seconds']:>10.2f}{row['rtf']:>9.4f}{row['speed']:>12.2f}")
+    speedup = results[0]["wall_seconds"] / results[1]["wall_seconds"] if results[1]["wall_seconds"] > 0 else 0
+    print(f"\n{Fore.YELLOW}🚀 Batched speedup: {speedup:.2f}x{Style.RESET_ALL}")
+
+    if args.output:
+        save_bench_results(args.output, results, {"model_size": args.model_size, "device": device, "compute_type": compute_type, "beam_size": args.beam_size})
+
+def write_metrics_textfile(path, files, failed, wall_seconds):
+    """Writes the run's metrics for node_exporter's textfile collector.
+
+    Written to a temporary file and renamed, so the collector never reads a
+    partial file.
+    """
+    gauges = {
+        "batch_files": len(files),
+        "batch_failed_files": len(failed),
+        "batch_wall_seconds": round(wall_seconds, 3),
+        "batch_last_run_timestamp_seconds": round(time.time()),
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(METRICS.prometheus(gauges))
+    os.replace(tmp_path, path)
+
+def write_run_report(path, args, device, compute_type, files, failed, total_audio, wall_seconds):
+    """Writes the --metrics-out JSON report: settings, totals, per-phase times and peak memory."""
+    import platform
+
+    report = {
+        "host": platform.node(),
+        "cores": available_cores(),
+        "settings": {
+            "model_size": args.model_size,
+            "device": device,
+            "compute_type": compute_type,
+            "beam_size": args.beam_size,
+            "batch_size": args.batch_size,
+            "cpu_threads": args.cpu_threads,
+            "workers": args.workers,
+            "vad": args.vad,
+            "cascade": args.cascade,
+        },
+        "files": len(files),
+        "failed": len(failed),
+        "audio_seconds": round(total_audio, 2),
+        "wall_seconds": round(wall_seconds, 3),
+        "rtf": round(wall_seconds / total_audio, 4) if total_audio > 0 else None,
+        "phases": METRICS.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+        # Largest of the worker processes, for --workers
+        "peak_rss_children_mb": peak_rss_mb(children=True),
+    }
+    if args.cascade:
+        redecoded = METRICS.counters.get(("cascade_redecoded_seconds", ()), 0.0)
+        report["cascade_redecoded_fraction"] = round(redecoded / total_audio, 4) if total_audio > 0 else None
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"{Fore.GREEN}✔ Run report saved: {path}")
+
+def add_transcription_arguments(parser):
+    """Model, decoding and output options shared by every mode."""
+    parser.add_argument("--language", help="🌐 Language code (e.g., ms, en). Leave empty to auto-detect")
+    parser.add_argument("--output_dir", default=".", help="📁 Directory to save output files")
+    parser.add_argument("--formats", default="srt,json", help="💾 Output formats: srt,json,txt (comma-separated)")
+    parser.add_argument("--model_size", default="medium", help="Size of the Whisper model (e.g., tiny, base, small, medium, large-v2, large-v3)")
+    parser.add_argument("--device", default="auto", choices=["auto", "cuda", "cpu"], help="Device to use for computation (auto, cuda, cpu)")
+    parser.add_argument("--compute_type", default="auto", help="Compute type for the model (e.g., float16, int8_float16, int8, float32). 'auto' selects float16 for GPU and int8 for CPU.")
+    parser.add_argument("--cpu_threads", type=int, default=0, help="Number of CPU threads to use (0 for auto-detection)")
+    parser.add_argument("--beam_size", type=int, default=5, help="Beam size for decoding (e.g., 1 for greedy, 5 for more accuracy)")
+    parser.add_argument("--batch_size", "--batch-size", type=int, default=1, help="Decode this many VAD chunks at once with faster-whisper's batched pipeline (1 for sequential decoding)")
+    parser.add_argument("--vad", action="store_true", help="🔇 Skip silence with Silero VAD before decoding")
+    parser.add_argument("--vad_min_silence_ms", "--vad-min-silence-ms", type=int, help="🔇 Minimum silence (ms) that splits speech (faster-whisper default: 2000)")
+    parser.add_argument("--vad_speech_pad_ms", "--vad-speech-pad-ms", type=int, help="🔇 Padding (ms) kept around each speech chunk (faster-whisper default: 400)")
+    parser.add_argument("--vad_threshold", "--vad-threshold", type=float, help="🔇 Speech probability threshold between 0 and 1 (faster-whisper default: 0.5)")
+    parser.add_argument("--language_windows", "--language-windows", type=int, default=0, help="🌐 Detect the language from speech found in each of this many equal parts of the file (one 30 s detection pass, at most 300 parts) instead of its first 30 s (0 to disable)")
+    parser.add_argument("--language_pin", "--language-pin", type=int, default=0, help="🌐 Stop detecting once this many files in a row agree: for the rest of the batch, and for later runs on the same directory (0 to disable)")
+    parser.add_argument("--checkpoint", action="store_true", help="⏯️  Save decoded segments to a hidden .ckpt file next to the outputs, and resume an interrupted file from its last segment")
+    parser.add_argument("--checkpoint_interval", "--checkpoint-interval", type=float, default=30, help="⏯️  Seconds between forced disk syncs of the checkpoint file")
+    parser.add_argument("--model_cache_mb", "--model-cache-mb", type=int, default=4096, help="Memory budget in MB for keeping models loaded when several sizes/compute types are used (0 for no limit)")
+
+def check_transcription_arguments(parser, args):
+    """Rejects values of the shared options that can't work."""
+    # Each window needs at least one 100 ms frame of the 30 s detection pass
+    if not 0 <= args.language_windows <= 300:
+        parser.error("--language_windows must be between 0 and 300")
+    if args.language_pin < 0:
+        parser.error("--language_pin must not be negative")
+
+def add_cache_arguments(parser):
+    parser.add_argument("--cache_dir", "--cache-dir", default=default_cache_dir(), help="♻️  Directory for cached transcripts, keyed by audio hash and decode settings")
+    parser.add_argument("--no_cache", "--no-cache", action="store_true", help="♻️  Don't read or write the transcript cache")
+    parser.add_argument("--cache_max_mb", "--cache-max-mb", type=int, default=1024, help="♻️  Size limit of the transcript cache in MB; least recently used entries are evicted")
+    parser.add_argument("--audio_cache", "--audio-cache", action="store_true", help="♻️  Keep decoded 16 kHz audio as memory-mapped .npy files in the cache directory, so re-runs skip decoding")
+    parser.add_argument("--audio_cache_max_mb", "--audio-cache-max-mb", type=int, default=10240, help="♻️  Size limit of the decoded audio cache in MB (about 230 MB per hour of audio)")
+
+# `transcribe <name> ...` runs one of these instead of the regular transcription CLI
+SUBCOMMANDS = {
+    "serve": serve_main,
+    "bench": bench_main,
+    "live": live_main,
+}
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+
+    main_start_time = time.time()
+
+    parser = argparse.ArgumentParser(description="🎧 Transcribe audio using faster-whisper")
+    parser.add_argument("--file", help="📂 Path to audio file. If not provided, will enter interactive mode.")
+    parser.add_argument("--input_dir", "--input-dir", help="📂 Transcribe every audio file in this directory (batch mode)")
+    parser.add_argument("--glob", help="📂 Transcribe every file matching this glob pattern, e.g. 'calls/**/*.wav' (batch mode)")
+    parser.add_argument("--file_list", "--file-list", help="📂 Text file with one audio path per line (batch mode)")
+    add_transcription_arguments(parser)
+    parser.add_argument("--skip_existing", "--skip-existing", "--resume", action="store_true", help="⏭️  Skip files whose outputs a previous run completed (checked via the completion marker written after every file)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes for batch mode, each with its own model (CPU threads are split evenly between them). Default: 1, or the --autotune result for this host")
+    parser.add_argument("--prefetch", type=int, default=1, help="Number of upcoming files to decode in the background while the current one is transcribed (0 to disable)")
+    parser.add_argument("--chunk_minutes", "--chunk-minutes", type=float, default=0, help="✂️  With --workers, split each file into chunks of about this many minutes (cut at quiet points) and transcribe them in parallel (0 to disable)")
+    parser.add_argument("--chunk_overlap", "--chunk-overlap", type=float, default=2.0, help="✂️  Seconds of audio shared by neighbouring chunks; duplicated text in the overlap is removed")
+    parser.add_argument("--stdout", default="text", choices=["text", "ndjson"], help="📤 'ndjson' streams one JSON record per segment plus a summary per file to stdout as they are decoded; status output moves to stderr")
+    parser.add_argument("--autotune", action="store_true", help="🎛️  Time a few worker/thread splits on this host and save the fastest; later runs use it whenever --workers/--cpu_threads aren't given")
+    parser.add_argument("--metrics_out", "--metrics-out", help="📈 Write a JSON run report with the time spent in each phase (import, model load, audio decode, language detection, decoding, writers) and peak memory to this file")
+    parser.add_argument("--metrics_textfile", "--metrics-textfile", help="📈 Write Prometheus metrics (files, audio seconds, RTF and model load histograms, segments, errors) to this .prom file for node_exporter's textfile collector")
+    parser.add_argument("--profile", help="🔬 Profile the transcription and writer code with cProfile, save the stats to this file and print the top functions")
+    parser.add_argument("--profile_top", "--profile-top", type=int, default=25, help="🔬 Number of functions in the --profile summary")
+    parser.add_argument("--cascade", metavar="MODEL", help="🪜 Decode each file greedily with this smaller model first (e.g. small) and re-decode only its low-confidence segments with --model_size")
+    parser.add_argument("--cascade_logprob", "--cascade-logprob", type=float, default=-0.7, help="🪜 Re-decode draft segments whose average log probability is below this")
+    parser.add_argument("--cascade_no_speech", "--cascade-no-speech", type=float, default=0.5, help="🪜 Re-decode draft segments whose no-speech probability is above this")
+    parser.add_argument("--cascade_compression", "--cascade-compression", type=float, default=2.2, help="🪜 Re-decode draft segments whose gzip compression ratio is above this (repeated text)")
+    parser.add_argument("--autotune_seconds", "--autotune-seconds", type=float, default=30, help="🎛️  Length of the calibration clip in seconds")
+    add_cache_arguments(parser)
+
+    args = parser.parse_args()
+
+    check_transcription_arguments(parser, args)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.cascade and (args.checkpoint or args.chunk_minutes > 0):
+        parser.error("--cascade can't be combined with --checkpoint or --chunk-minutes")
+    if args.stdout == "ndjson":
+        # stdout carries only the records; everything meant for humans goes to stderr
+        sys.stdout = sys.stderr
+    MODEL_POOL.budget_bytes = args.model_cache_mb * 1024 * 1024
+    if args.profile:
+        global PROFILER
+        PROFILER = SectionProfiler()
+        # Worker files left by an earlier run would be merged into this run's summary
+        for stale in glob.glob(glob.escape(args.profile) + ".worker*"):
+            os.remove(stale)
+
+    # If no input is provided, enter interactive mode
+    if not (args.file or args.input_dir or args.glob or args.file_list):
+        if args.autotune:
+            # Only calibrate this host
+            device = resolve_device(args.device)
+            if device != "cpu":
+                print(f"{Fore.YELLOW}🎛️  Nothing to tune on {device}: worker and thread counts only apply to CPU inference.{Style.RESET_ALL}")
+                return
+            autotune(args, resolve_compute_type(args.compute_type, device), [])
+            return
+        args = interactive_setup(args)
+
+    files = resolve_inputs(args)
+    if not files:
+        print(f"{Fore.RED}No audio files to transcribe.{Style.RESET_ALL}")
+        sys.exit(1)
+
+    if args.skip_existing:
+        # Done before hashing, decoding or loading anything
+        remaining = [file_path for file_path in files if not is_complete(file_path, args)]
+        if len(remaining) < len(files):
+            print(f"{Fore.GREEN}⏭️  Skipping {len(files) - len(remaining)}/{len(files)} files with complete outputs{Style.RESET_ALL}")
+        if not remaining:
+            print(f"\n{Fore.CYAN}✅ Nothing to do, every output is already complete.{Style.RESET_ALL}")
+            return
+        files = remaining
+
+    # Resolve device and compute type from 'auto'
+    device = resolve_device(args.device)
+    compute_type = resolve_compute_type(args.compute_type, device)
+
+    if device == "cpu":
+        profile = autotune(args, compute_type, files) if args.autotune else load_autotune_profile(args, compute_type)
+        if profile:
+            apply_autotune_profile(args, profile, parallel=len(files) > 1 or args.chunk_minutes > 0)
+            if not args.autotune:
+                print(f"{Fore.CYAN}🎛️  Using this host's autotune profile: {args.workers or 1} workers, {args.cpu_threads or 'auto'} CPU threads{Style.RESET_ALL}")
+    if args.workers is None:
+        args.workers = 1
+
+    language_str = args.language if args.language else "Auto-detect"
+    print(f"{Fore.YELLOW}🌍 Language: {language_str}")
+    if len(files) == 1:
+        print(f"{Fore.GREEN}📥 File: {files[0]}")
+    else:
+        print(f"{Fore.GREEN}📥 Files: {len(files)}")
+    print(f"{Fore.BLUE}📤 Output Dir: {args.output_dir}")
+    print(f"{Fore.MAGENTA}💾 Formats: {args.formats.upper()}")
+    print(f"{Fore.YELLOW}⚙️  Settings: Device={device}, Compute={compute_type}, Beam Size={args.beam_size}{Style.RESET_ALL}")
+    if args.cascade:
+        print(f"{Fore.YELLOW}🪜 Cascade: '{args.cascade}' drafts, '{args.model_size}' re-decodes low-confidence segments{Style.RESET_ALL}")
+    if device == "cpu":
+        cpu_threads_str = str(args.cpu_threads) if args.cpu_threads > 0 else "Auto"
+        print(f"{Fore.YELLOW}           CPU Threads={cpu_threads_str}{Style.RESET_ALL}\n")
+    else:
+        print("")
+
+    batch_start_time = time.time()
+    pending, cache_keys = files, {}
+    if not args.no_cache:
+        with METRICS.phase("cache_lookup"):
+            pending, cache_keys = serve_from_cache(files, args, compute_type)
+        if len(pending) < len(files):
+            print(f"{Fore.GREEN}♻️  {len(files) - len(pending)}/{len(files)} files served from cache{Style.RESET_ALL}")
+
+    # When every file is cached the model is never loaded
+    total_audio, failed = 0.0, []
+    if args.workers > 1 and args.chunk_minutes > 0 and pending:
+        total_audio, failed = run_chunked(pending, args, device, compute_type, cache_keys)
+    elif args.workers > 1 and len(pending) > 1:
+        total_audio, failed = run_worker_pool(pending, args, device, compute_type, cache_keys)
+    elif pending:
+        total_audio, failed = run_batch(pending, args, device, compute_type, cache_keys)
+
+    if len(files) > 1:
+        batch_time = time.time() - batch_start_time
+        throughput = total_audio / batch_time if batch_time > 0 else 0
+        rtf = batch_time / total_audio if total_audio > 0 else 0
+        print(f"\n{Fore.YELLOW}📊 Batch: {len(files) - len(failed)}/{len(files)} files, {timedelta(seconds=round(total_audio))} of audio in {timedelta(seconds=round(batch_time))}{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}🚀 Aggregate throughput: {throughput:.2f} audio seconds/s (RTF {rtf:.3f}){Style.RESET_ALL}")
+        if args.cascade and total_audio > 0:
+            redecoded = METRICS.counters.get(("cascade_redecoded_seconds", ()), 0.0)
+            print(f"{Fore.YELLOW}🪜 Cascade: {redecoded / total_audio:.0%} of the audio was re-decoded with '{args.model_size}'{Style.RESET_ALL}")
+        for file_path in failed:
+            print(f"{Fore.RED}✘ Failed: {file_path}{Style.RESET_ALL}")
 
     print(f"\n{Fore.CYAN}✅ Done! Subtitles are written to '{os.path.abspath(args.output_dir)}' directory.{Style.RESET_ALL}")
 
@@ -267,5 +3089,15 @@ def main():
     total_runtime = main_end_time - main_start_time
     print(f"{Fore.CYAN}⏱️  Operation finished in: {timedelta(seconds=total_runtime)}{Style.RESET_ALL}")
 
+    if PROFILER is not None:
+        PROFILER.save(args.profile, args.profile_top)
+    if args.metrics_out:
+        write_run_report(args.metrics_out, args, device, compute_type, files, failed, total_audio, total_runtime)
+    if args.metrics_textfile:
+        write_metrics_textfile(args.metrics_textfile, files, failed, total_runtime)
+
+    if failed:
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()